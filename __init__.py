@@ -15,9 +15,11 @@ from .node_value_to_string import NodeValue2StringMulti
 from .outpaint_padding import OutpaintPadding
 from .video_extend import LoadVideoForExtending, PrepVideoForExtend
 from .video_from_folder import VideoFromFolder
+from .video_batch_from_folder import VideoBatchFromFolder
 from .nano_banana_multi_input import NanoBananaMultiInput
 from .json_extractor import JsonExtractorKlinter
 from .save_audio_plus import SaveAudioPlus
+from .save_video_plus import SaveVideoPlus
 from .bbox_cropper import BBoxCropper
 from .output_tester import OutputTester
 from .flexible_batch_image import FlexibleBatchImage
@@ -48,6 +50,8 @@ NODE_CLASS_MAPPINGS = {
     "LoadVideoForExtendingKlinter": LoadVideoForExtending,
     "PrepVideoForExtendKlinter": PrepVideoForExtend,
     "VideoFromFolder": VideoFromFolder,
+    "VideoBatchFromFolder": VideoBatchFromFolder,
+    "SaveVideoPlus": SaveVideoPlus,
     
     # AI Image Generation nodes
     "NanoBananaMultiInput": NanoBananaMultiInput,
@@ -81,6 +85,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "LoadVideoForExtendingKlinter": "Load Video For Extending - klinter",
     "PrepVideoForExtendKlinter": "Prep Video For Extend - klinter",
     "VideoFromFolder": "Video From Folder - klinter",
+    "VideoBatchFromFolder": "Video Batch From Folder - klinter",
+    "SaveVideoPlus": "Save Video+ - klinter",
     "NanoBananaMultiInput": "Nano Banana Multi Input - Klinter",
     "Json Extractor - klinter": "Json Extractor - klinter",
     "SaveAudioPlus": "Save Audio Plus - klinter",
@@ -0,0 +1,312 @@
+"""Streaming rawvideo reader for ffmpeg subprocesses used by the klinter video nodes."""
+
+import os
+import time
+import queue
+import struct
+import threading
+import subprocess
+from collections import deque
+import numpy as np
+import torch
+
+try:
+    import comfy.model_management as model_management
+    HAS_COMFY = True
+    # Raised when the user cancels the prompt; loaders re-raise it past their back end fallbacks
+    InterruptProcessingException = model_management.InterruptProcessingException
+except ImportError:
+    HAS_COMFY = False
+
+    class InterruptProcessingException(Exception):
+        """Stand-in outside ComfyUI, where nothing raises it."""
+
+# Output options for the audio track: float PCM in a WAV container, whose
+# header carries the sample rate and channel count
+AUDIO_OUTPUT_ARGS = ['-vn', '-map', '0:a:0', '-c:a', 'pcm_f32le', '-f', 'wav']
+
+# Extra pipes for a second ffmpeg output rely on pass_fds, which Windows lacks
+SUPPORTS_AUDIO_PIPE = os.name == 'posix'
+
+
+def parse_wav_audio(data: bytes) -> dict:
+    """Turn float32 WAV bytes from ffmpeg into a ComfyUI AUDIO dict.
+
+    Args:
+        data: WAV file bytes (pcm_f32le); size fields may be unset when streamed
+
+    Returns:
+        dict: {'waveform': tensor (1, channels, samples), 'sample_rate': int},
+        or None if there is no audio
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+    offset = 12
+    channels = sample_rate = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack('<I', data[offset + 4:offset + 8])[0]
+        offset += 8
+        if chunk_id == b'fmt ':
+            channels, sample_rate = struct.unpack('<HI', data[offset + 2:offset + 8])
+        elif chunk_id == b'data':
+            if channels is None:
+                return None
+            # Piped output leaves the size unset, so read to the end
+            payload = data[offset:]
+            samples = len(payload) // (4 * channels)
+            if samples == 0:
+                return None
+            pcm = np.frombuffer(payload, dtype='<f4', count=samples * channels)
+            waveform = torch.from_numpy(pcm.reshape(samples, channels).T.copy()).unsqueeze(0)
+            return {'waveform': waveform, 'sample_rate': sample_rate}
+        offset += chunk_size + (chunk_size & 1)
+    return None
+
+
+def silent_audio(duration: float, sample_rate: int = 44100) -> dict:
+    """Silent mono AUDIO dict of the given length, for clips without an audio track."""
+    samples = max(int(round(duration * sample_rate)), 1)
+    return {'waveform': torch.zeros((1, 1, samples)), 'sample_rate': sample_rate}
+
+
+def extract_audio(video_path: str, start_time: float = 0.0, duration: float = 0.0,
+                  executable: str = 'ffmpeg') -> dict:
+    """Decode only the audio track of a time window, without touching the video stream.
+
+    Args:
+        video_path: Path to the media file
+        start_time: Window start in seconds
+        duration: Window length in seconds (0 = to the end)
+        executable: ffmpeg binary to run
+
+    Returns:
+        dict: ComfyUI AUDIO dict, or None if the file has no audio
+    """
+    cmd = [executable, '-hide_banner', '-nostdin', '-loglevel', 'error']
+    if start_time > 0:
+        cmd += ['-ss', f"{start_time:.6f}"]
+    cmd += ['-i', video_path]
+    if duration > 0:
+        cmd += ['-t', f"{duration:.6f}"]
+    cmd += [*AUDIO_OUTPUT_ARGS, '-']
+    result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True)
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', 'replace')
+        if 'matches no streams' not in message:
+            print(f"FFmpeg could not extract audio from {video_path}: {message.strip()}")
+        return None
+    return parse_wav_audio(result.stdout)
+
+
+class FFmpegFrameReader:
+    """Iterate rgb24 frames from an ffmpeg pipe without stalling or per-frame allocations.
+
+    - stderr is drained on its own thread (keeping the last lines for error
+      messages), so a verbose ffmpeg can never fill the pipe and hang the run.
+    - A reader thread fills a fixed pool of preallocated frame buffers with
+      readinto(); a bounded queue hands them to the consumer and they are
+      recycled, so a slow consumer applies backpressure to ffmpeg instead of
+      growing memory.
+    - ComfyUI interrupts are checked on every frame and kill the subprocess.
+    - frames_read / fps report the achieved decode rate.
+
+    Usage:
+        with FFmpegFrameReader(['-i', path], width, height) as reader:
+            for frame in reader:  # (H, W, 3) uint8 view, valid until the next frame
+                sink.append(frame)
+    """
+
+    STDERR_LINES = 50
+
+    def __init__(self, args: list, width: int, height: int, channels: int = 3,
+                 queue_size: int = 4, executable: str = 'ffmpeg', loglevel: str = 'error',
+                 on_stderr=None, audio_args: list = None):
+        """Prepare a reader; the process starts on iteration or start().
+
+        Args:
+            args: ffmpeg arguments up to (not including) the output options
+            width: Output frame width
+            height: Output frame height
+            channels: Bytes per pixel of the output pixel format (3 for rgb24)
+            queue_size: Maximum decoded frames waiting for the consumer
+            executable: ffmpeg binary to run
+            loglevel: ffmpeg -loglevel; raise to 'info' for filters such as showinfo
+            on_stderr: Optional callable receiving every stderr line, called
+                from the drain thread
+            audio_args: Output options (e.g. ['-t', '2.5']) for a second output
+                carrying the first audio track over an extra pipe; None for
+                video only. Needs SUPPORTS_AUDIO_PIPE and a file with audio.
+        """
+        self.cmd = [executable, '-hide_banner', '-nostdin', '-loglevel', loglevel, *args,
+                    '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+        self.shape = (height, width, channels)
+        self.audio_args = audio_args
+        self._audio = bytearray()
+        self.frame_size = height * width * channels
+        self.queue_size = max(int(queue_size), 1)
+        self.frames_read = 0
+        self.returncode = None
+        self.process = None
+        self.on_stderr = on_stderr
+        self._stderr = deque(maxlen=self.STDERR_LINES)
+        self._filled = queue.Queue(maxsize=self.queue_size)
+        self._free = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+        self._started_at = None
+        self._finished_at = None
+        self._error = None
+        self._eof = False
+
+    def start(self):
+        """Launch ffmpeg and the stderr and reader threads."""
+        if self.process is not None:
+            return self
+        # Consumer holds one buffer and the reader fills one while the queue is full
+        for _ in range(self.queue_size + 2):
+            self._free.put(np.empty(self.shape, dtype=np.uint8))
+        targets = [self._drain_stderr, self._read_frames]
+        if self.audio_args is None:
+            self.process = subprocess.Popen(self.cmd, stdin=subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        else:
+            # Same invocation, second output: the audio goes to an inherited pipe
+            audio_read, audio_write = os.pipe()
+            cmd = [*self.cmd, *self.audio_args, *AUDIO_OUTPUT_ARGS, f'pipe:{audio_write}']
+            try:
+                self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                                stderr=subprocess.PIPE, pass_fds=(audio_write,))
+            finally:
+                os.close(audio_write)
+            self._audio_pipe = os.fdopen(audio_read, 'rb', buffering=0)
+            targets.append(self._drain_audio)
+        self._started_at = time.perf_counter()
+        for target in targets:
+            thread = threading.Thread(target=target, name=f"klinter-ffmpeg-{target.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b''):
+            line = line.decode('utf-8', 'replace').rstrip()
+            self._stderr.append(line)
+            if self.on_stderr is not None:
+                self.on_stderr(line)
+        self.process.stderr.close()
+
+    def _drain_audio(self):
+        """Collect the audio output; read concurrently so neither pipe can stall ffmpeg."""
+        with self._audio_pipe as pipe:
+            for chunk in iter(lambda: pipe.read(1 << 16), b''):
+                self._audio.extend(chunk)
+
+    def _read_frames(self):
+        """Fill free buffers from stdout and queue them until EOF or stop."""
+        stdout = self.process.stdout
+        try:
+            while not self._stop.is_set():
+                buffer = self._free.get()
+                if buffer is None:
+                    break
+                view = memoryview(buffer).cast('B')
+                filled = 0
+                while filled < self.frame_size:
+                    n = stdout.readinto(view[filled:])
+                    if not n:
+                        break
+                    filled += n
+                if filled < self.frame_size:
+                    break
+                self._put(buffer)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(None)
+
+    def _put(self, item):
+        """Queue an item for the consumer, giving up if the reader is being stopped."""
+        while True:
+            try:
+                self._filled.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    return
+
+    def __iter__(self):
+        self.start()
+        buffer = None
+        try:
+            while True:
+                if HAS_COMFY and model_management.processing_interrupted():
+                    self.close()
+                    model_management.throw_exception_if_processing_interrupted()
+                buffer = self._filled.get()
+                if buffer is None:
+                    self._eof = True
+                    break
+                self.frames_read += 1
+                yield buffer
+                self._free.put(buffer)
+                buffer = None
+        finally:
+            if buffer is not None:
+                self._free.put(buffer)
+            self._finish()
+
+    def _finish(self):
+        """Reap the process and surface ffmpeg failures.
+
+        An early exit by the consumer (enough frames, interrupt, error) kills
+        ffmpeg and ignores its exit status; reaching EOF waits for it and
+        raises if it failed.
+        """
+        if self._eof:
+            self.returncode = self.process.wait()
+        self.close()
+        if self._error is not None:
+            raise RuntimeError(f"FFmpeg read error: {self._error}")
+        if self._eof and self.returncode != 0:
+            raise RuntimeError(f"FFmpeg error: {self.stderr_tail()}")
+
+    def close(self):
+        """Stop ffmpeg and the helper threads; safe to call more than once."""
+        if self.process is None:
+            return
+        self._stop.set()
+        if self.process.poll() is None:
+            self.process.kill()
+        # Unblock a reader waiting for a free buffer
+        self._free.put(None)
+        self.returncode = self.process.wait()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self.process.stdout.close()
+        if self._finished_at is None:
+            self._finished_at = time.perf_counter()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def audio(self) -> dict:
+        """ComfyUI AUDIO dict of the second output once iteration finished, or None."""
+        return parse_wav_audio(bytes(self._audio)) if self.audio_args is not None else None
+
+    def stderr_tail(self) -> str:
+        """Last lines ffmpeg wrote to stderr."""
+        return "\n".join(self._stderr)
+
+    @property
+    def fps(self) -> float:
+        """Frames delivered per second of wall time so far."""
+        if self._started_at is None:
+            return 0.0
+        elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        return self.frames_read / elapsed if elapsed > 0 else 0.0
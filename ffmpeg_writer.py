@@ -0,0 +1,149 @@
+"""Streaming rawvideo writer for ffmpeg subprocesses used by the klinter video nodes."""
+
+import os
+import struct
+import threading
+import subprocess
+from collections import deque
+import numpy as np
+
+
+def write_wav_audio(path: str, audio: dict, max_seconds: float = 0.0):
+    """Write the first item of a ComfyUI AUDIO dict as a float32 WAV file.
+
+    Args:
+        path: Destination file
+        audio: {'waveform': tensor (B, C, T), 'sample_rate': int}
+        max_seconds: Trim the track to this length (0 = keep all)
+    """
+    waveform = audio['waveform']
+    if waveform.dim() == 3:
+        waveform = waveform[0]
+    sample_rate = int(audio['sample_rate'])
+    if max_seconds > 0:
+        waveform = waveform[:, :int(round(max_seconds * sample_rate))]
+    channels, samples = waveform.shape
+    # Interleave channels sample by sample
+    pcm = np.ascontiguousarray(waveform.float().cpu().numpy().T, dtype='<f4')
+    data_size = pcm.nbytes
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE')
+        # Format 3 is IEEE float
+        f.write(b'fmt ' + struct.pack('<IHHIIHH', 16, 3, channels, sample_rate,
+                                      sample_rate * channels * 4, channels * 4, 32))
+        f.write(b'data' + struct.pack('<I', data_size))
+        f.write(memoryview(pcm).cast('B'))
+
+
+class FFmpegFrameWriter:
+    """Feed rgb24 frames to an ffmpeg encoder through stdin.
+
+    stderr is drained on its own thread so a verbose encoder can never block
+    the pipe; frames are written as they arrive, so nothing beyond the
+    caller's current chunk is held in memory.
+
+    Usage:
+        with FFmpegFrameWriter(path, width, height, fps, ['-c:v', 'libx264']) as writer:
+            for chunk in float_to_uint8_chunks(frames):
+                writer.write(chunk)
+    """
+
+    STDERR_LINES = 50
+
+    def __init__(self, output_path: str, width: int, height: int, fps: float, output_args: list,
+                 input_args: list = None, executable: str = 'ffmpeg'):
+        """Prepare a writer; the process starts on start() or entering the context.
+
+        Args:
+            output_path: File to encode into (overwritten)
+            width: Frame width
+            height: Frame height
+            fps: Frame rate of the input frames
+            output_args: Encoder options placed before the output path
+            input_args: Extra inputs after the frame pipe (e.g. ['-i', 'audio.wav'])
+            executable: ffmpeg binary to run
+        """
+        self.output_path = output_path
+        self.frame_size = width * height * 3
+        self.cmd = [executable, '-hide_banner', '-loglevel', 'error', '-y',
+                    '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}',
+                    '-r', f'{fps}', '-i', '-', *(input_args or []), *output_args, output_path]
+        self.frames_written = 0
+        self.process = None
+        self._stderr = deque(maxlen=self.STDERR_LINES)
+        self._thread = None
+
+    def start(self):
+        """Launch ffmpeg and the stderr drain thread."""
+        if self.process is not None:
+            return self
+        self.process = subprocess.Popen(self.cmd, stdin=subprocess.PIPE,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._drain_stderr, name="klinter-ffmpeg-writer-stderr",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b''):
+            self._stderr.append(line.decode('utf-8', 'replace').rstrip())
+        self.process.stderr.close()
+
+    def write(self, frames: np.ndarray):
+        """Write a (N, H, W, 3) or (H, W, 3) uint8 array of frames."""
+        frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        if frames.size % self.frame_size:
+            raise ValueError(f"Frame data of {frames.size} bytes is not a whole number of frames")
+        try:
+            self.process.stdin.write(memoryview(frames).cast('B'))
+        except BrokenPipeError:
+            # ffmpeg exited early; close() reports why
+            self.close()
+        self.frames_written += frames.size // self.frame_size
+
+    def close(self):
+        """Finish encoding and raise if ffmpeg failed.
+
+        Returns:
+            str: Path of the written file
+        """
+        if self.process is None:
+            return self.output_path
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.process.wait()
+        self._thread.join(timeout=5)
+        if returncode != 0:
+            raise RuntimeError(f"FFmpeg error: {self.stderr_tail()}")
+        return self.output_path
+
+    def abort(self):
+        """Kill ffmpeg and delete the partial output."""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+        self._thread.join(timeout=5)
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def stderr_tail(self) -> str:
+        """Last lines ffmpeg wrote to stderr."""
+        return "\n".join(self._stderr)
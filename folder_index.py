@@ -0,0 +1,357 @@
+"""Persistent per-folder indexes of the files read by the klinter loaders, and their filters."""
+
+import os
+import re
+import json
+import fnmatch
+import threading
+from PIL import Image
+
+try:
+    # Registers AVIF with Pillow builds that cannot decode it natively
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# The extra formats are only listed when this Pillow build can decode them
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'} | (
+    {'.tif', '.tiff', '.bmp', '.avif'} & set(Image.registered_extensions()))
+
+SORT_MODES = ["name", "natural"]
+PATTERN_TYPES = ["glob", "regex"]
+
+
+def natural_sort_key(name: str) -> list:
+    """Sort key ordering embedded numbers by value, so 'img2' comes before 'img10'."""
+    # Splitting on a capture group alternates text and digits, so parts compare like with like
+    return [int(part) if part.isdecimal() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def _compile_patterns(patterns: str, pattern_type: str):
+    """Compile comma separated globs, or one regular expression; None if empty."""
+    patterns = patterns.strip()
+    if not patterns:
+        return None
+    if pattern_type == "regex":
+        source = patterns
+    else:
+        # Anchor the globs so they behave like fnmatch against the whole relative path
+        source = "^(?:" + "|".join(fnmatch.translate(glob.strip()) for glob in patterns.split(",")
+                                   if glob.strip()) + ")"
+    try:
+        return re.compile(source)
+    except re.error as e:
+        raise ValueError(f"Invalid {pattern_type} pattern '{patterns}': {e}")
+
+
+def filter_files(names: list, include: str = "", exclude: str = "", pattern_type: str = "glob",
+                 sort: str = "name") -> list:
+    """Filter and order index file names.
+
+    Args:
+        names: Relative file paths ('/' separated) from an index
+        include: Keep only names matching this (empty keeps everything)
+        exclude: Drop names matching this
+        pattern_type: 'glob' for comma separated globs matched against the
+            whole relative path, 'regex' for a regular expression searched in it
+        sort: 'name' for plain string order, 'natural' for numbers by value
+
+    Returns:
+        list: The selected names in order
+    """
+    include_re = _compile_patterns(include, pattern_type)
+    exclude_re = _compile_patterns(exclude, pattern_type)
+    if include_re is not None:
+        names = [name for name in names if include_re.search(name)]
+    if exclude_re is not None:
+        names = [name for name in names if not exclude_re.search(name)]
+    if sort == "natural":
+        return sorted(names, key=lambda name: (natural_sort_key(name), name))
+    return sorted(names)
+
+
+class FolderIndex:
+    """Sidecar JSON index of the files with one of EXTENSIONS in one folder.
+
+    The index records each file's size, mtime and, once requested, metadata
+    probed from it. The directory is only re-listed when its own mtime
+    changes, and a file is only re-probed when its size or mtime changed, so
+    repeated runs over large network folders skip both the listing and the
+    probes. Subclasses set INDEX_FILENAME and EXTENSIONS.
+
+    A recursive index also lists the non-hidden subfolders, naming files by
+    their '/' separated path relative to the folder. It records every
+    subfolder's mtime and child folders, so a later run stats the folders of
+    the tree and re-lists only those whose mtime changed; the walk uses
+    os.scandir's file types and never stats individual files.
+    """
+
+    INDEX_DIRNAME = ".klinter_index"
+    INDEX_FILENAME = None
+    EXTENSIONS = frozenset()
+    # Version 1 files could carry a dir_mtime without a listing
+    VERSION = 2
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, folder_path: str, recursive: bool = False):
+        self.folder_path = folder_path
+        self.recursive = recursive
+        # The index lives in a hidden subfolder so rewriting it does not touch
+        # the mtime of the indexed folder itself, which drives re-listing
+        self.index_dir = os.path.join(folder_path, self.INDEX_DIRNAME)
+        filename = self.INDEX_FILENAME
+        if recursive:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_recursive{ext}"
+        self.index_path = os.path.join(self.index_dir, filename)
+        self.dir_mtime = None
+        self.dirs = {}
+        self.entries = {}
+        self._files = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    @classmethod
+    def for_folder(cls, folder_path: str, recursive: bool = False) -> "FolderIndex":
+        """Return the shared index for a folder, creating it on first use."""
+        # Keyed by class too, so a folder's video and image indexes stay apart
+        key = (cls, os.path.abspath(folder_path), recursive)
+        with cls._instances_lock:
+            index = cls._instances.get(key)
+            if index is None:
+                index = cls(key[1], recursive)
+                cls._instances[key] = index
+            return index
+
+    def _load(self):
+        """Read the sidecar file, ignoring it if missing, stale or unreadable."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.VERSION:
+            return
+        self.dir_mtime = data.get('dir_mtime')
+        self.dirs = data.get('dirs', {})
+        self.entries = data.get('entries', {})
+        # Entries saved by get_info() before any listing are not the folder's contents
+        if self.dir_mtime is not None:
+            self._files = sorted(self.entries)
+
+    def save(self):
+        """Write the index into the folder's sidecar directory if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'version': self.VERSION,
+                'dir_mtime': self.dir_mtime,
+                'dirs': self.dirs,
+                'entries': self.entries,
+            }
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            try:
+                if not os.path.isdir(self.index_dir):
+                    os.makedirs(self.index_dir, exist_ok=True)
+                    # Creating the subfolder is the one write that changes the
+                    # folder mtime; fold it in so the next run does not re-list,
+                    # but only if the folder was listed at all
+                    if self._files is not None:
+                        self.dir_mtime = os.stat(self.folder_path).st_mtime_ns
+                        data['dir_mtime'] = self.dir_mtime
+                        if "" in self.dirs:
+                            self.dirs[""]['mtime'] = self.dir_mtime
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.index_path)
+                self._dirty = False
+            except OSError as e:
+                # Read-only shares still benefit from the in-memory index
+                print(f"Could not write folder index {self.index_path}: {e}")
+
+    def _rescan(self, dir_mtime):
+        """Re-list the folder, keeping entries whose size and mtime are unchanged."""
+        entries = {}
+        with os.scandir(self.folder_path) as it:
+            for entry in it:
+                if os.path.splitext(entry.name.lower())[1] not in self.EXTENSIONS:
+                    continue
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                old = self.entries.get(entry.name)
+                if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns:
+                    entries[entry.name] = old
+                else:
+                    entries[entry.name] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'info': None}
+        self.entries = entries
+        self._files = sorted(entries)
+        self.dir_mtime = dir_mtime
+        self._dirty = True
+
+    def _scan_tree(self) -> bool:
+        """Walk the folder tree, re-listing only the folders whose mtime changed.
+
+        Returns:
+            bool: Whether any folder was re-listed
+        """
+        dirs = {}
+        entries = {}
+        changed = self._files is None
+        pending = [""]
+        while pending:
+            rel = pending.pop()
+            full = os.path.join(self.folder_path, rel)
+            try:
+                mtime = os.stat(full).st_mtime_ns
+            except FileNotFoundError:
+                # Removed since its parent was listed
+                changed = True
+                continue
+            old = self.dirs.get(rel)
+            if old is not None and old['mtime'] == mtime:
+                # An unchanged mtime means the same names; keep the cached listing
+                dirs[rel] = old
+                for name in old['files']:
+                    entries[name] = self.entries.get(name) or {'size': None, 'mtime': None, 'info': None}
+                pending.extend(old['subdirs'])
+                continue
+
+            changed = True
+            files = []
+            subdirs = []
+            with os.scandir(full) as it:
+                for entry in it:
+                    name = f"{rel}/{entry.name}" if rel else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        # Hidden folders include the sidecar index itself
+                        if not entry.name.startswith('.'):
+                            subdirs.append(name)
+                    elif os.path.splitext(entry.name.lower())[1] in self.EXTENSIONS and entry.is_file():
+                        files.append(name)
+                        # Sizes and mtimes are filled in by stat_files / get_info when needed
+                        entries[name] = self.entries.get(name) or {'size': None, 'mtime': None, 'info': None}
+            dirs[rel] = {'mtime': mtime, 'files': files, 'subdirs': subdirs}
+            pending.extend(subdirs)
+
+        if changed:
+            self.dirs = dirs
+            self.entries = entries
+            self._files = sorted(entries)
+            self.dir_mtime = dirs.get("", {}).get('mtime')
+            self._dirty = True
+        return changed
+
+    def files(self) -> list:
+        """Return the sorted file names, re-listing only if the folder changed.
+
+        Returns:
+            list: Sorted names of the indexed files in the folder ('/' separated
+            relative paths for a recursive index)
+        """
+        if not os.path.isdir(self.folder_path):
+            raise FileNotFoundError(f"Folder '{self.folder_path}' cannot be found.")
+        if self.recursive:
+            with self._lock:
+                if self._scan_tree():
+                    self.save()
+                return list(self._files)
+        dir_mtime = os.stat(self.folder_path).st_mtime_ns
+        with self._lock:
+            if self._files is None or dir_mtime != self.dir_mtime:
+                self._rescan(dir_mtime)
+                self.save()
+            return list(self._files)
+
+    def stat_files(self, names: list) -> list:
+        """Stat the given files, resetting the entries of any that changed since the last scan.
+
+        A file rewritten in place keeps the folder mtime, so this is what
+        notices edits to files already in the listing.
+
+        Args:
+            names: File names inside the folder
+
+        Returns:
+            list: (name, size, mtime_ns) for each file, in the given order
+        """
+        stats = []
+        changed = False
+        for name in names:
+            stat = os.stat(os.path.join(self.folder_path, name))
+            with self._lock:
+                entry = self.entries.get(name)
+                if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime_ns:
+                    self._entry(name, stat)
+                    changed = True
+            stats.append((name, stat.st_size, stat.st_mtime_ns))
+        if changed:
+            with self._lock:
+                self._dirty = True
+                self.save()
+        return stats
+
+    def get_info(self, name: str, probe, save: bool = True) -> dict:
+        """Return cached metadata for a file, probing only if it changed.
+
+        Args:
+            name: File name inside the folder
+            probe: Callable taking a full path and returning an info dict or None
+            save: Write the index afterwards; pass False when indexing many
+                files and call save() once at the end
+
+        Returns:
+            dict: Probed info, or None if probing failed
+        """
+        path = os.path.join(self.folder_path, name)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.entries.get(name)
+            if (entry and entry['info'] is not None
+                    and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns):
+                return dict(entry['info'])
+
+        info = probe(path)
+        if info is None:
+            return None
+
+        with self._lock:
+            self._entry(name, stat)['info'] = dict(info)
+            self._dirty = True
+            if save:
+                self.save()
+        return info
+
+    def _entry(self, name: str, stat) -> dict:
+        """Return the entry for a file, resetting it if the file changed."""
+        entry = self.entries.get(name)
+        if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime_ns:
+            entry = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'info': None}
+            self.entries[name] = entry
+        return entry
+
+    def signature(self, name: str = None) -> str:
+        """Cheap token that changes whenever the folder listing (or one file) changes.
+
+        Args:
+            name: Optional file name whose size and mtime are folded in
+
+        Returns:
+            str: Token suitable for ComfyUI's fingerprint_inputs
+        """
+        token = str(os.stat(self.folder_path).st_mtime_ns)
+        if name:
+            stat = os.stat(os.path.join(self.folder_path, name))
+            token += f"_{stat.st_size}_{stat.st_mtime_ns}"
+        return token
+
+
+class ImageFolderIndex(FolderIndex):
+    """Sidecar JSON index of the image files in one folder."""
+
+    INDEX_FILENAME = "images.json"
+    EXTENSIONS = IMAGE_EXTENSIONS
@@ -1,14 +1,95 @@
 import os
+import json
+import math
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import torch
 import numpy as np
 from comfy_api.latest import io
+from .folder_index import IMAGE_EXTENSIONS, PATTERN_TYPES, SORT_MODES, ImageFolderIndex, filter_files
+from .lru_cache import LRUCache
+from .manifest_index import ManifestIndex, is_manifest
+from .tensor_utils import OUTPUT_DTYPES, resolve_dtype, uint8_to_float
+from .video_utils import PIL_RESAMPLE, RESAMPLE_FILTERS, resolve_output_size
+
+try:
+    import comfy.model_management as model_management
+    HAS_COMFY = True
+except ImportError:
+    HAS_COMFY = False
+
+# How images of different sizes are brought into one batch
+RESIZE_MODES = ["none", "resize", "letterbox", "center_crop", "bucket"]
+
+# Bucket resolutions are multiples of this many pixels
+BUCKET_STEP = 64
+
+DEFAULT_IMAGE_CACHE_MB = 2048
+
+# Fitted uint8 images kept between runs by the incremental mode, a quarter of
+# the size of float32 copies; KLINTER_IMAGE_CACHE_MB sets the budget
+image_cache = LRUCache(int(float(os.environ.get("KLINTER_IMAGE_CACHE_MB", DEFAULT_IMAGE_CACHE_MB)) * 1024 * 1024))
+
+
+def _bucket_size(width: int, height: int, area: int) -> tuple:
+    """Resolution of the aspect ratio bucket for an image, close to the given pixel area."""
+    aspect = width / height
+    bucket_w = max(BUCKET_STEP, round(math.sqrt(area * aspect) / BUCKET_STEP) * BUCKET_STEP)
+    bucket_h = max(BUCKET_STEP, round(math.sqrt(area / aspect) / BUCKET_STEP) * BUCKET_STEP)
+    return bucket_w, bucket_h
+
+
+def _scaled_size(size: tuple, target: tuple, mode: str) -> tuple:
+    """Size the source is scaled to before it is padded or cropped to the target."""
+    if mode == "resize":
+        return target
+    width, height = size
+    pick = min if mode == "letterbox" else max
+    scale = pick(target[0] / width, target[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _fit_image(img: Image.Image, target: tuple, mode: str, resample: str) -> Image.Image:
+    """Scale an RGB image to the target size with the given mode.
+
+    Args:
+        img: Source image
+        target: (width, height) of the result
+        mode: 'resize' stretches, 'letterbox' fits and pads with black,
+            'center_crop' and 'bucket' cover and crop the middle
+        resample: One of RESAMPLE_FILTERS
+
+    Returns:
+        Image.Image: Image of exactly the target size
+    """
+    if img.size == target:
+        return img
+    scaled = _scaled_size(img.size, target, mode)
+    if scaled != img.size:
+        img = img.resize(scaled, PIL_RESAMPLE[resample])
+    if scaled == target:
+        return img
+    left = (scaled[0] - target[0]) // 2
+    top = (scaled[1] - target[1]) // 2
+    if mode == "letterbox":
+        canvas = Image.new('RGB', target)
+        canvas.paste(img, (-left, -top))
+        return canvas
+    return img.crop((left, top, left + target[0], top + target[1]))
+
 
 class FolderLoader(io.ComfyNode):
+    """Load a folder of images, or the images listed in a manifest, as one batch.
+
+    Worker threads decode and fit each image on uint8 data straight into its
+    row of a preallocated output tensor, keeping the batch in file order.
+    """
+
     @classmethod
     def define_schema(cls) -> io.Schema:
         """Define the schema for the folder loader node.
-        
+
         Returns:
             io.Schema: Node schema with inputs and outputs
         """
@@ -18,45 +99,231 @@ class FolderLoader(io.ComfyNode):
             category="klinter",
             description="Load images from a folder",
             inputs=[
-                io.String.Input("folder_path", default=""),
+                io.String.Input("folder_path", default="",
+                                tooltip="Folder of images, or a manifest file (.csv, .jsonl, .txt, .lst) "
+                                        "listing image paths"),
                 io.Int.Input("image_load_cap", default=0, min=0, step=1, optional=True),
                 io.Int.Input("start_index", default=0, min=0, step=1, optional=True),
+                io.Combo.Input("output_dtype", options=list(OUTPUT_DTYPES), default="float32", optional=True,
+                               tooltip="Precision of the images output; float16/bfloat16 halve memory"),
+                io.Int.Input("workers", default=0, min=0, max=256, step=1, optional=True,
+                             tooltip="Images decoded at the same time (0 = number of CPU cores)"),
+                io.Combo.Input("resize_mode", options=RESIZE_MODES, default="none", optional=True,
+                               tooltip="none: all images must match; resize: stretch to the target; "
+                                       "letterbox: fit and pad with black; center_crop: fill and crop; "
+                                       "bucket: group by aspect ratio into sub-batches"),
+                io.Int.Input("target_width", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Output width (0 = from height / first image); with bucket, "
+                                     "width * height sets the bucket pixel area (0 = group by exact size)"),
+                io.Int.Input("target_height", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Output height (0 = from width / first image)"),
+                io.Combo.Input("resample", options=RESAMPLE_FILTERS, default="area", optional=True),
+                io.Boolean.Input("incremental", default=False, optional=True,
+                                 tooltip="Keep each decoded image in memory and only decode new or changed "
+                                         "files on the next run (KLINTER_IMAGE_CACHE_MB sets the budget)"),
+                io.Boolean.Input("recursive", default=False, optional=True,
+                                 tooltip="Also load images from subfolders (hidden folders are skipped)"),
+                io.String.Input("include", default="", optional=True,
+                                tooltip="Only load files whose path relative to the folder matches "
+                                        "(comma separated globs such as '*.png, portraits/*', or a regex)"),
+                io.String.Input("exclude", default="", optional=True,
+                                tooltip="Skip files whose relative path matches (globs or a regex)"),
+                io.Combo.Input("pattern_type", options=PATTERN_TYPES, default="glob", optional=True,
+                               tooltip="How include and exclude are read"),
+                io.Combo.Input("sort", options=SORT_MODES, default="name", optional=True,
+                               tooltip="name: plain string order; natural: numbers by value (img2 before img10)"),
             ],
             outputs=[
-                io.Image.Output(display_name="images")
+                io.Image.Output(display_name="images"),
+                io.Image.Output(display_name="batches", is_output_list=True),
             ]
         )
-    
+
     @classmethod
-    def execute(cls, folder_path: str, image_load_cap: int = 0, start_index: int = 0) -> io.NodeOutput:
-        if not os.path.isdir(folder_path):
-            raise FileNotFoundError(f"Folder '{folder_path}' cannot be found.")
-        
-        valid_extensions = {'.jpg', '.jpeg', '.png', '.webp'}
-        image_files = sorted([
-            f for f in os.listdir(folder_path)
-            if os.path.splitext(f.lower())[1] in valid_extensions
-        ])
-
-        image_files = image_files[start_index:]
-        if image_load_cap > 0:
-            image_files = image_files[:image_load_cap]
-
-        if not image_files:
-            raise ValueError("No valid images found in folder")
-
-        images = []
-        for image_path in image_files:
-            full_path = os.path.join(folder_path, image_path)
-            img = Image.open(full_path)
-            
+    def _select_files(cls, folder_path: str, start_index: int = 0, image_load_cap: int = 0,
+                      recursive: bool = False, include: str = "", exclude: str = "",
+                      pattern_type: str = "glob", sort: str = "name") -> list:
+        """Return the full paths of the requested page of the folder or manifest.
+
+        The scan options only apply to folders; a manifest's order and
+        contents are its own, which keeps its pages a single seek.
+        """
+        stop = start_index + image_load_cap if image_load_cap > 0 else None
+        if is_manifest(folder_path):
+            return ManifestIndex.for_path(folder_path)[start_index:stop]
+        image_files = ImageFolderIndex.for_folder(folder_path, recursive).files()
+        if include or exclude or sort != "name":
+            image_files = filter_files(image_files, include, exclude, pattern_type, sort)
+        return [os.path.join(folder_path, image_path) for image_path in image_files[start_index:stop]]
+
+    @classmethod
+    def _stat_files(cls, folder_path: str, paths: list, recursive: bool = False) -> list:
+        """(name, size, mtime_ns) of each file, refreshing the folder index entries on the way."""
+        if is_manifest(folder_path):
+            return [(path, stat.st_size, stat.st_mtime_ns) for path, stat in zip(paths, map(os.stat, paths))]
+        names = [os.path.relpath(path, folder_path).replace(os.sep, '/') for path in paths]
+        return ImageFolderIndex.for_folder(folder_path, recursive).stat_files(names)
+
+    @classmethod
+    def fingerprint_inputs(cls, folder_path, image_load_cap=0, start_index=0, recursive=False, include="",
+                           exclude="", pattern_type="glob", sort="name", **kwargs):
+        """Tell ComfyUI when the node output changes, from the selected files' names, sizes and mtimes."""
+        try:
+            paths = cls._select_files(folder_path, start_index, image_load_cap, recursive,
+                                      include, exclude, pattern_type, sort)
+            stats = cls._stat_files(folder_path, paths, recursive)
+        except (OSError, ValueError):
+            # execute() reports the missing folder or file
+            return float("NaN")
+        return hashlib.sha1(json.dumps(stats).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _read_size(cls, full_path: str) -> tuple:
+        """Image size from the file header, without decoding the pixels."""
+        with Image.open(full_path) as img:
+            return img.size
+
+    @classmethod
+    def _decode(cls, full_path: str, target: tuple, mode: str, resample: str) -> np.ndarray:
+        """Decode one image to uint8 RGB, fitted to the target size unless mode is 'none'."""
+        with Image.open(full_path) as img:
+            if mode != "none" and img.format == 'JPEG':
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale, never below the scaled size
+                img.draft('RGB', _scaled_size(img.size, target, mode))
             if img.mode != 'RGB':
                 img = img.convert('RGB')
-                
-            img_tensor = torch.from_numpy(np.array(img).astype(np.float32) / 255.0)
-            images.append(img_tensor)
+            if mode != "none":
+                img = _fit_image(img, target, mode, resample)
+            return np.array(img)
+
+    @classmethod
+    def _decode_into(cls, full_path: str, out: torch.Tensor, mode: str = "none", resample: str = "area",
+                     cache_key: tuple = None) -> bool:
+        """Decode one image, fit it to its row and write it into the preallocated output.
+
+        Args:
+            full_path: Image file
+            out: (H, W, 3) output row
+            mode: Fit mode passed to _fit_image, or 'none'
+            resample: One of RESAMPLE_FILTERS
+            cache_key: Key of the fitted image in image_cache, None to bypass the cache
+
+        Returns:
+            bool: True if the file was decoded, False if it came from the cache
+        """
+        if HAS_COMFY:
+            model_management.throw_exception_if_processing_interrupted()
+        data = image_cache.get(cache_key) if cache_key is not None else None
+        if data is not None:
+            uint8_to_float(data, out.dtype, out=out)
+            return False
+
+        data = cls._decode(full_path, (out.shape[1], out.shape[0]), mode, resample)
+        if data.shape != tuple(out.shape):
+            raise ValueError(f"Image '{os.path.basename(full_path)}' is {data.shape[1]}x{data.shape[0]}, "
+                             f"expected {out.shape[1]}x{out.shape[0]} like the first image; "
+                             "choose a resize_mode for folders of mixed sizes")
+        data = torch.from_numpy(data)
+        if cache_key is not None:
+            image_cache.put(cache_key, data)
+        uint8_to_float(data, out.dtype, out=out)
+        return True
+
+    @classmethod
+    def _plan_batches(cls, paths: list, pool: ThreadPoolExecutor, resize_mode: str,
+                      target_width: int, target_height: int) -> list:
+        """Group the files into batches of one output size.
+
+        Returns:
+            list: ((width, height), [path indices]) per batch, in order of first file
+        """
+        if resize_mode != "bucket":
+            size = cls._read_size(paths[0])
+            if resize_mode != "none":
+                size = resolve_output_size(*size, target_width, target_height) or size
+            return [(size, list(range(len(paths))))]
+
+        # Headers are read on the pool too; on network shares they are not free
+        sizes = list(pool.map(cls._read_size, paths))
+        area = target_width * target_height or target_width ** 2 or target_height ** 2
+        buckets = {}
+        for i, size in enumerate(sizes):
+            key = _bucket_size(*size, area) if area else size
+            buckets.setdefault(key, []).append(i)
+        return list(buckets.items())
+
+    @classmethod
+    def execute(cls, folder_path: str, image_load_cap: int = 0, start_index: int = 0,
+                output_dtype: str = "float32", workers: int = 0, resize_mode: str = "none",
+                target_width: int = 0, target_height: int = 0, resample: str = "area",
+                incremental: bool = False, recursive: bool = False, include: str = "", exclude: str = "",
+                pattern_type: str = "glob", sort: str = "name") -> io.NodeOutput:
+        """Load the images of a folder as a batch.
+
+        Args:
+            folder_path: Folder containing the images, or a manifest listing them
+            image_load_cap: Maximum number of images to load (0 = all)
+            start_index: Index of the first image in sorted order
+            output_dtype: Precision of the images output
+            workers: Images decoded at the same time (0 = CPU core count)
+            resize_mode: How images of different sizes are brought together
+            target_width: Output width, or with bucket the bucket area width
+            target_height: Output height, or with bucket the bucket area height
+            resample: Resampling filter used when resizing
+            incremental: Reuse cached decodes of files that did not change
+            recursive: Include images in subfolders
+            include: Globs or regex the relative paths must match
+            exclude: Globs or regex of relative paths to skip
+            pattern_type: 'glob' or 'regex'
+            sort: 'name' or 'natural' file order
+
+        Returns:
+            io.NodeOutput: The first batch, and every batch as a list (one per
+            bucket in bucket mode, otherwise just the full batch)
+        """
+        if not os.path.isdir(folder_path) and not is_manifest(folder_path):
+            raise FileNotFoundError(f"Folder '{folder_path}' cannot be found.")
+
+        paths = cls._select_files(folder_path, start_index, image_load_cap, recursive,
+                                  include, exclude, pattern_type, sort)
+
+        if not paths:
+            raise ValueError(f"No valid images found in folder (formats: {', '.join(sorted(IMAGE_EXTENSIONS))})")
+
+        dtype = resolve_dtype(output_dtype)
+        fit_mode = "center_crop" if resize_mode == "bucket" else resize_mode
+        stats = cls._stat_files(folder_path, paths, recursive) if incremental else None
+
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="klinter-folder") as pool:
+            plan = cls._plan_batches(paths, pool, resize_mode, target_width, target_height)
+
+            batches = []
+            futures = []
+            for (width, height), members in plan:
+                batch = torch.empty((len(members), height, width, 3), dtype=dtype)
+                batches.append(batch)
+                for row, i in enumerate(members):
+                    cache_key = None
+                    if incremental:
+                        # Size and mtime change with the file, so stale decodes are never hit
+                        cache_key = (os.path.abspath(paths[i]), *stats[i][1:], width, height, fit_mode, resample)
+                    futures.append(pool.submit(cls._decode_into, paths[i], batch[row], fit_mode, resample,
+                                               cache_key))
+            for future in futures:
+                # Surface the first failure and drop the decodes not yet started
+                if future.exception() is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    raise future.exception()
 
-        return io.NodeOutput(torch.stack(images))
+        if incremental:
+            decoded = sum(future.result() for future in futures)
+            print(f"Decoded {decoded} of {len(paths)} images ({len(paths) - decoded} unchanged, from cache)")
+        if len(batches) > 1:
+            print(f"Loaded {len(paths)} images into {len(batches)} buckets: " + ", ".join(
+                f"{batch.shape[2]}x{batch.shape[1]} ({batch.shape[0]})" for batch in batches))
+        return io.NodeOutput(batches[0], batches)
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
@@ -68,4 +335,4 @@ NODE_DISPLAY_NAME_MAPPINGS = {
 }
 
 # Export the class
-__all__ = ['FolderLoader']
\ No newline at end of file
+__all__ = ['FolderLoader']
@@ -6,6 +6,7 @@ import numpy as np
 from PIL import Image, ImageOps
 import folder_paths
 from comfy_api.latest import io, ui
+from .tensor_utils import OUTPUT_DTYPES, resolve_dtype, uint8_to_float
 
 class LoadImagePlusKlinter(io.ComfyNode):
     """Node that loads an image and returns the image, mask, and filename."""
@@ -27,6 +28,8 @@ class LoadImagePlusKlinter(io.ComfyNode):
             description="Load an image and return it along with its mask and filename",
             inputs=[
                 io.Combo.Input("image", options=sorted(files)),
+                io.Combo.Input("output_dtype", options=list(OUTPUT_DTYPES), default="float32", optional=True,
+                               tooltip="Precision of the image and mask outputs"),
             ],
             outputs=[
                 io.Image.Output(display_name="image"),
@@ -36,11 +39,12 @@ class LoadImagePlusKlinter(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, image: str) -> io.NodeOutput:
+    def execute(cls, image: str, output_dtype: str = "float32") -> io.NodeOutput:
         """Load an image and return it along with its mask and filename.
         
         Args:
             image: Name of the image file to load
+            output_dtype: Precision of the image and mask outputs
             
         Returns:
             io.NodeOutput: Image tensor, mask, and filename without extension
@@ -49,22 +53,22 @@ class LoadImagePlusKlinter(io.ComfyNode):
         i = Image.open(image_path)
         i = ImageOps.exif_transpose(i)
         img = i.convert("RGB")
-        img_array = np.array(img).astype(np.float32) / 255.0
-        img_tensor = torch.from_numpy(img_array)[None,]
+        dtype = resolve_dtype(output_dtype)
+        img_tensor = uint8_to_float(np.array(img), dtype)[None,]
         
         # Get filename without extension
         filename = os.path.splitext(os.path.basename(image_path))[0]
         
         # Extract alpha channel if present, otherwise create zero mask
         if i.mode == "RGBA":
-            mask = torch.from_numpy(np.array(i.split()[-1]).astype(np.float32))[None,] / 255.0
+            mask = uint8_to_float(np.array(i.split()[-1]), dtype)[None,]
         else:
-            mask = torch.zeros((1, img_tensor.shape[1], img_tensor.shape[2]), dtype=torch.float32)
+            mask = torch.zeros((1, img_tensor.shape[1], img_tensor.shape[2]), dtype=dtype)
         
-        return io.NodeOutput(img_tensor, mask, filename, ui=ui.PreviewImage(img_tensor, cls=cls))
+        return io.NodeOutput(img_tensor, mask, filename, ui=ui.PreviewImage(img_tensor.float(), cls=cls))
     
     @classmethod
-    def fingerprint_inputs(cls, image: str) -> str:
+    def fingerprint_inputs(cls, image: str, output_dtype: str = "float32") -> str:
         """Return hash of file content for cache control.
         
         Args:
@@ -0,0 +1,211 @@
+"""Offset-indexed manifests listing the files of datasets too large to list by folder."""
+
+import os
+import csv
+import json
+import struct
+import threading
+from array import array
+from collections.abc import Sequence
+import numpy as np
+
+MANIFEST_EXTENSIONS = {'.csv', '.jsonl', '.txt', '.lst'}
+
+# Column names (CSV header) or keys (JSONL objects) that hold the file path,
+# in order of preference
+PATH_FIELDS = ("path", "file_path", "filepath", "file", "filename", "image", "video")
+
+
+def is_manifest(path: str) -> bool:
+    """Whether a loader's folder_path input names a manifest file instead of a folder."""
+    return os.path.splitext(path.lower())[1] in MANIFEST_EXTENSIONS and os.path.isfile(path)
+
+
+def _is_record(line: bytes) -> bool:
+    """Blank lines and '#' comments are not records."""
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith(b'#')
+
+
+class ManifestIndex(Sequence):
+    """Random access to the file paths listed in a manifest.
+
+    A manifest is a plain list (.txt/.lst, one path per line), a CSV file
+    (first column, or the column named like PATH_FIELDS when there is a
+    header row) or JSONL (a path string, or an object with one of the
+    PATH_FIELDS keys per line). Records are one per line; relative paths are
+    resolved against the manifest's folder.
+
+    The first use scans the manifest once and writes the byte offset of every
+    record to an offsets file in the sidecar .klinter_index folder next to
+    it. Later runs memory-map that file, so reading item i or a page of
+    items seeks straight to its bytes without reading the rest of the
+    manifest or listing any directory. The offsets are rebuilt whenever the
+    manifest's size or mtime changes.
+    """
+
+    INDEX_DIRNAME = ".klinter_index"
+    # magic, manifest size, manifest mtime_ns, record count, path column
+    HEADER = struct.Struct('<8sQqQq')
+    MAGIC = b"KLMANIF1"
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.root = os.path.dirname(manifest_path)
+        self.format = os.path.splitext(manifest_path.lower())[1]
+        name = os.path.basename(manifest_path)
+        self.offsets_path = os.path.join(self.root, self.INDEX_DIRNAME, f"{name}.offsets")
+        self.offsets = None
+        self.column = 0
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, manifest_path: str) -> "ManifestIndex":
+        """Return the shared index for a manifest, creating it on first use."""
+        key = os.path.abspath(manifest_path)
+        with cls._instances_lock:
+            index = cls._instances.get(key)
+            if index is None:
+                index = cls(key)
+                cls._instances[key] = index
+            return index
+
+    def _refresh(self) -> np.ndarray:
+        """Return the record offsets, loading or rebuilding them if the manifest changed."""
+        stat = os.stat(self.manifest_path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if stamp != self._stamp:
+                if not self._load(stamp):
+                    self._build(stamp)
+                self._stamp = stamp
+            return self.offsets
+
+    def _load(self, stamp) -> bool:
+        """Map the offsets file if it was built for this version of the manifest."""
+        try:
+            with open(self.offsets_path, 'rb') as f:
+                magic, size, mtime, count, column = self.HEADER.unpack(f.read(self.HEADER.size))
+        except (OSError, struct.error):
+            return False
+        if magic != self.MAGIC or (size, mtime) != stamp:
+            return False
+        self.offsets = np.memmap(self.offsets_path, dtype='<u8', mode='r',
+                                 offset=self.HEADER.size, shape=(count + 1,))
+        self.column = column
+        return True
+
+    def _build(self, stamp):
+        """Scan the manifest once, recording where each record starts."""
+        print(f"Indexing manifest {self.manifest_path}")
+        starts = array('Q')
+        column = 0
+        position = 0
+        check_header = self.format == '.csv'
+        with open(self.manifest_path, 'rb') as f:
+            for line in f:
+                if _is_record(line):
+                    if check_header:
+                        check_header = False
+                        header = self._header_column(line)
+                        if header is not None:
+                            column = header
+                            position += len(line)
+                            continue
+                    starts.append(position)
+                position += len(line)
+        # The end of the file closes the last record
+        starts.append(position)
+
+        offsets = np.frombuffer(starts, dtype=np.uint64).astype('<u8')
+        self.offsets = offsets
+        self.column = column
+        tmp_path = f"{self.offsets_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.offsets_path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, stamp[0], stamp[1], len(offsets) - 1, column))
+                f.write(offsets.tobytes())
+            os.replace(tmp_path, self.offsets_path)
+        except OSError as e:
+            # Read-only shares still benefit from the in-memory offsets
+            print(f"Could not write manifest offsets {self.offsets_path}: {e}")
+
+    @staticmethod
+    def _header_column(line: bytes):
+        """Index of the path column if the CSV line is a header row, else None."""
+        cells = [cell.strip().lower() for cell in next(csv.reader([line.decode('utf-8-sig')]))]
+        for field in PATH_FIELDS:
+            if field in cells:
+                return cells.index(field)
+        return None
+
+    def _parse(self, line: bytes) -> str:
+        """Resolve the file path of one record line."""
+        text = line.decode('utf-8-sig').strip()
+        if self.format == '.csv':
+            path = next(csv.reader([text]))[self.column]
+        elif self.format == '.jsonl':
+            record = json.loads(text)
+            if isinstance(record, dict):
+                path = next((record[field] for field in PATH_FIELDS if field in record), None)
+                if path is None:
+                    raise ValueError(f"Manifest record has none of the keys {PATH_FIELDS}: {text[:200]}")
+            else:
+                path = record
+        else:
+            path = text
+        return os.path.join(self.root, path.strip())
+
+    def _read(self, start: int, stop: int) -> list:
+        """Read and parse records [start, stop) with one seek."""
+        offsets = self._refresh()
+        if start >= stop:
+            return []
+        with open(self.manifest_path, 'rb') as f:
+            f.seek(int(offsets[start]))
+            data = f.read(int(offsets[stop]) - int(offsets[start]))
+        return [self._parse(line) for line in data.splitlines() if _is_record(line)]
+
+    def __len__(self) -> int:
+        return len(self._refresh()) - 1
+
+    def __getitem__(self, item):
+        count = len(self)
+        if isinstance(item, slice):
+            start, stop, step = item.indices(count)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._read(start, max(start, stop))
+        if item < 0:
+            item += count
+        if not 0 <= item < count:
+            raise IndexError(f"Manifest index {item} out of range ({count} records)")
+        return self._read(item, item + 1)[0]
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def files(self) -> "ManifestIndex":
+        """The manifest itself, as a lazy sequence of absolute file paths."""
+        return self
+
+    def signature(self, name: str = None) -> str:
+        """Cheap token that changes whenever the manifest (or one listed file) changes.
+
+        Args:
+            name: Optional listed path whose size and mtime are folded in
+
+        Returns:
+            str: Token suitable for ComfyUI's fingerprint_inputs
+        """
+        stat = os.stat(self.manifest_path)
+        token = f"{stat.st_size}_{stat.st_mtime_ns}"
+        if name:
+            stat = os.stat(os.path.join(self.root, name))
+            token += f"_{stat.st_size}_{stat.st_mtime_ns}"
+        return token
@@ -0,0 +1,160 @@
+"""Node for encoding an image batch to a video file by streaming it into ffmpeg."""
+
+import os
+import uuid
+import torch
+import folder_paths
+from comfy_api.latest import io, ui
+from .ffmpeg_writer import FFmpegFrameWriter, write_wav_audio
+from .tensor_utils import float_to_uint8_chunks
+from .video_backends import decoder_registry
+
+try:
+    import comfy.model_management as model_management
+    HAS_COMFY = True
+except ImportError:
+    HAS_COMFY = False
+
+# Container, audio codec and highest accepted CRF (None = no CRF) of each video codec
+VIDEO_CODECS = {
+    "libx264": {"extension": "mp4", "audio_codec": "aac", "max_crf": 51},
+    "libx265": {"extension": "mp4", "audio_codec": "aac", "max_crf": 51},
+    "libvpx-vp9": {"extension": "webm", "audio_codec": "libopus", "max_crf": 63},
+    "prores_ks": {"extension": "mov", "audio_codec": "pcm_s16le", "max_crf": None},
+    "ffv1": {"extension": "mkv", "audio_codec": "flac", "max_crf": None},
+}
+
+PIXEL_FORMATS = ["yuv420p", "yuv422p", "yuv444p", "yuv420p10le", "yuv422p10le", "yuv444p10le"]
+
+
+class SaveVideoPlus(io.ComfyNode):
+    """Encode frames to a video file without an intermediate image sequence.
+
+    Frames are converted to uint8 one chunk at a time and piped to ffmpeg as
+    rawvideo, so extra memory stays at one chunk however long the clip is.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        """Define the schema for the save video node.
+
+        Returns:
+            io.Schema: Node schema with inputs and outputs
+        """
+        return io.Schema(
+            node_id="SaveVideoPlus",
+            display_name="Save Video+ - klinter",
+            category="klinter",
+            description="Encode an image batch to a video file by streaming frames into ffmpeg",
+            is_output_node=True,
+            inputs=[
+                io.Image.Input("images"),
+                io.String.Input("filename_prefix", default="video/ComfyUI"),
+                io.Float.Input("fps", default=24.0, min=1.0, max=240.0, step=0.001),
+                io.Combo.Input("codec", options=list(VIDEO_CODECS), default="libx264",
+                               tooltip="Video encoder; picks the container (mp4, webm, mov or mkv)"),
+                io.Int.Input("crf", default=19, min=0, max=63, step=1,
+                             tooltip="Constant rate factor (lower = better quality): 0-51 for x264/x265, "
+                                     "0-63 for VP9; ignored by ProRes and FFV1"),
+                io.Combo.Input("pix_fmt", options=PIXEL_FORMATS, default="yuv420p"),
+                io.Audio.Input("audio", optional=True,
+                               tooltip="Muxed into the file, trimmed to the video length"),
+                io.Int.Input("chunk_frames", default=16, min=1, max=1024, step=1, optional=True,
+                             tooltip="Frames converted to uint8 and piped per step"),
+            ],
+            outputs=[
+                io.String.Output(display_name="video_path"),
+            ]
+        )
+
+    @classmethod
+    def _output_args(cls, codec: str, crf: int, pix_fmt: str, width: int, height: int,
+                     has_audio: bool) -> list:
+        """Build the ffmpeg encoder options for the chosen codec."""
+        args = ['-map', '0:v:0', '-c:v', codec, '-pix_fmt', pix_fmt]
+        if codec in ("libx264", "libx265"):
+            args += ['-crf', str(crf), '-preset', 'medium']
+        elif codec == "libvpx-vp9":
+            # Constant quality mode needs the bitrate cap disabled
+            args += ['-crf', str(crf), '-b:v', '0']
+        if codec in ("libx264", "libx265") and pix_fmt.startswith(("yuv420p", "yuv422p")) \
+                and (width % 2 or height % 2):
+            # Chroma subsampling needs even dimensions; pad by one pixel
+            args += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+        if VIDEO_CODECS[codec]["extension"] in ("mp4", "mov"):
+            args += ['-movflags', '+faststart']
+        if has_audio:
+            args += ['-map', '1:a:0', '-c:a', VIDEO_CODECS[codec]["audio_codec"]]
+        return args
+
+    @classmethod
+    def execute(cls, images: torch.Tensor, filename_prefix: str = "video/ComfyUI", fps: float = 24.0,
+                codec: str = "libx264", crf: int = 19, pix_fmt: str = "yuv420p", audio=None,
+                chunk_frames: int = 16) -> io.NodeOutput:
+        """Encode the frames (and optional audio) into a new file in the output folder.
+
+        Args:
+            images: (N, H, W, 3) float frames in [0, 1]
+            filename_prefix: Output name prefix, may contain a subfolder
+            fps: Frame rate of the video
+            codec: ffmpeg video encoder
+            crf: Constant rate factor for codecs that support it
+            pix_fmt: Encoded pixel format
+            audio: Optional AUDIO dict to mux
+            chunk_frames: Frames converted and piped per step
+
+        Returns:
+            io.NodeOutput: Path of the written video, with a video preview
+        """
+        if images.shape[0] == 0:
+            raise ValueError("No frames to encode")
+        if not decoder_registry.available('ffmpeg'):
+            raise ValueError("Saving video requires ffmpeg (system package or imageio[ffmpeg])")
+        max_crf = VIDEO_CODECS[codec]["max_crf"]
+        if max_crf is not None and crf > max_crf:
+            raise ValueError(f"{codec} accepts a crf of 0-{max_crf}, got {crf}")
+
+        height, width = images.shape[1], images.shape[2]
+        output_dir = folder_paths.get_output_directory()
+        full_output_folder, filename, counter, subfolder, _ = folder_paths.get_save_image_path(
+            filename_prefix, output_dir, width, height)
+        file = f"{filename}_{counter:05}_.{VIDEO_CODECS[codec]['extension']}"
+        video_path = os.path.join(full_output_folder, file)
+
+        input_args = []
+        audio_path = None
+        if audio is not None:
+            # The frames own stdin, so the audio goes in as a small temporary WAV
+            os.makedirs(folder_paths.get_temp_directory(), exist_ok=True)
+            audio_path = os.path.join(folder_paths.get_temp_directory(), f"klinter_audio_{uuid.uuid4().hex}.wav")
+            write_wav_audio(audio_path, audio, max_seconds=images.shape[0] / fps)
+            input_args = ['-i', audio_path]
+
+        output_args = cls._output_args(codec, crf, pix_fmt, width, height, audio is not None)
+        print(f"Encoding {images.shape[0]} frames to {video_path}")
+        try:
+            with FFmpegFrameWriter(video_path, width, height, fps, output_args, input_args,
+                                   executable=decoder_registry.ffmpeg) as writer:
+                for chunk in float_to_uint8_chunks(images, chunk_frames):
+                    if HAS_COMFY:
+                        model_management.throw_exception_if_processing_interrupted()
+                    writer.write(chunk)
+        finally:
+            if audio_path is not None and os.path.exists(audio_path):
+                os.remove(audio_path)
+
+        preview = ui.PreviewVideo([ui.SavedResult(file, subfolder, io.FolderType.output)])
+        return io.NodeOutput(video_path, ui=preview)
+
+
+# Register the node
+NODE_CLASS_MAPPINGS = {
+    "SaveVideoPlus": SaveVideoPlus
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "SaveVideoPlus": "Save Video+ - klinter"
+}
+
+# Export the class
+__all__ = ['SaveVideoPlus']
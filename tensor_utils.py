@@ -0,0 +1,91 @@
+"""Shared tensor conversion helpers for the klinter loader nodes."""
+
+import numpy as np
+import torch
+
+# Output precisions offered by the loader nodes
+OUTPUT_DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+}
+
+# Bytes of uint8 source converted per step in uint8_to_float
+CONVERT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def resolve_dtype(name: str) -> torch.dtype:
+    """Map an output_dtype input value to a torch dtype.
+
+    Args:
+        name: One of the OUTPUT_DTYPES keys
+
+    Returns:
+        torch.dtype: The matching floating point dtype
+    """
+    if name not in OUTPUT_DTYPES:
+        raise ValueError(f"Unsupported output dtype '{name}', expected one of {list(OUTPUT_DTYPES)}")
+    return OUTPUT_DTYPES[name]
+
+
+def uint8_to_float(data, dtype: torch.dtype = torch.float32, out: torch.Tensor = None,
+                   chunk_bytes: int = CONVERT_CHUNK_BYTES) -> torch.Tensor:
+    """Convert uint8 data to [0, 1] floats of the target dtype in large chunks.
+
+    Each chunk is cast straight to the target dtype and scaled in place, so
+    float16/bfloat16 outputs never pass through a float32 staging copy and
+    peak extra memory is one chunk.
+
+    Args:
+        data: uint8 numpy array (including np.memmap) or tensor; the first
+            axis is split into chunks
+        dtype: Output floating point dtype
+        out: Optional preallocated tensor of matching shape to write into
+        chunk_bytes: Approximate uint8 bytes converted per step
+
+    Returns:
+        torch.Tensor: Converted tensor (out, if given)
+    """
+    if isinstance(data, np.ndarray):
+        # Strided views (e.g. every Nth frame of a memmap) are wrapped without copying
+        data = torch.from_numpy(data)
+    if out is None:
+        out = torch.empty(data.shape, dtype=dtype)
+    if data.dim() == 0 or data.shape[0] == 0:
+        return out.copy_(data).div_(255.0)
+
+    row_bytes = max(data[0].nelement(), 1)
+    step = max(chunk_bytes // row_bytes, 1)
+    for start in range(0, data.shape[0], step):
+        end = min(start + step, data.shape[0])
+        out[start:end].copy_(data[start:end]).div_(255.0)
+    return out
+
+
+def float_to_uint8_chunks(frames: torch.Tensor, chunk_frames: int = 16):
+    """Yield consecutive chunks of [0, 1] float frames as uint8 arrays.
+
+    One uint8 chunk buffer is reused for every chunk and the scaling goes
+    through a single float32 frame of scratch, so the extra memory is one
+    chunk of uint8 data regardless of clip length or input dtype.
+
+    Args:
+        frames: (N, H, W, C) float tensor of any floating dtype or device
+        chunk_frames: Frames per yielded chunk
+
+    Yields:
+        np.ndarray: (n, H, W, C) uint8 view of the shared buffer, valid until
+        the next chunk is requested
+    """
+    total = frames.shape[0]
+    chunk_frames = max(min(int(chunk_frames), total), 1)
+    out = torch.empty((chunk_frames, *frames.shape[1:]), dtype=torch.uint8)
+    scratch = torch.empty(frames.shape[1:], dtype=torch.float32)
+    for start in range(0, total, chunk_frames):
+        count = min(chunk_frames, total - start)
+        for i in range(count):
+            torch.mul(frames[start + i].cpu(), 255.0, out=scratch)
+            # Round to nearest; copy_ into uint8 truncates
+            scratch.add_(0.5).clamp_(0.0, 255.0)
+            out[i].copy_(scratch)
+        yield out[:count].numpy()
@@ -0,0 +1,57 @@
+"""Shared fixtures: the node pack imported as a package, the way ComfyUI loads custom nodes."""
+
+import os
+import sys
+import importlib
+import numpy as np
+import pytest
+
+PACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLIP_FRAMES = 60
+
+try:
+    import comfy_api.latest  # noqa: F401
+    import folder_paths  # noqa: F401
+except ImportError:
+    # Outside a ComfyUI checkout, run against the minimal stand-ins in tests/stubs
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs"))
+
+
+@pytest.fixture(scope="session")
+def klinter():
+    """The imported node pack (the same module object pytest imported)."""
+    parent = os.path.dirname(PACK_DIR)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+    return importlib.import_module(os.path.basename(PACK_DIR))
+
+
+@pytest.fixture(scope="session")
+def clip(tmp_path_factory):
+    """An all-intra MJPEG clip of CLIP_FRAMES distinct frames, so seeks land on exact frames."""
+    cv2 = pytest.importorskip("cv2")
+    path = tmp_path_factory.mktemp("clips") / "counter.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 24.0, (64, 48))
+    for i in range(CLIP_FRAMES):
+        frame = np.full((48, 64, 3), (i * 4) % 256, dtype=np.uint8)
+        frame[:, i % 64] = 255
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+@pytest.fixture
+def pinned_backend(klinter, monkeypatch):
+    """Pin the decoder order to one back end, restoring the registry afterwards."""
+    registry = klinter.video_backends.decoder_registry
+
+    def pin(name):
+        if not registry.available(name):
+            pytest.skip(f"{name} is not installed")
+        monkeypatch.setenv("KLINTER_DECODER_ORDER", name)
+        registry.refresh()
+
+    yield pin
+    monkeypatch.delenv("KLINTER_DECODER_ORDER", raising=False)
+    registry.refresh()
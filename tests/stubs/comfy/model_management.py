@@ -0,0 +1,23 @@
+"""Interrupt handling of comfy.model_management, as the klinter nodes use it."""
+
+interrupt_processing = False
+
+
+class InterruptProcessingException(Exception):
+    pass
+
+
+def interrupt_current_processing(value=True):
+    global interrupt_processing
+    interrupt_processing = value
+
+
+def processing_interrupted():
+    return interrupt_processing
+
+
+def throw_exception_if_processing_interrupted():
+    global interrupt_processing
+    if interrupt_processing:
+        interrupt_processing = False
+        raise InterruptProcessingException()
@@ -0,0 +1,13 @@
+"""Progress reporting of comfy.utils, as a no-op."""
+
+
+class ProgressBar:
+    def __init__(self, total):
+        self.total = total
+        self.current = 0
+
+    def update(self, value):
+        self.current += value
+
+    def update_absolute(self, value, total=None, preview=None):
+        self.current = value
@@ -0,0 +1,41 @@
+"""Just enough of comfy_api.latest to import the nodes and call their classmethods."""
+
+
+class _Anything:
+    """Accepts any arguments and attribute access, e.g. io.Int.Input("x", default=0)."""
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, *args, **kwargs):
+        return _Anything(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Anything()
+
+
+class _Namespace(_Anything):
+    pass
+
+
+class ComfyNode:
+    pass
+
+
+class ComfyExtension:
+    pass
+
+
+class NodeOutput:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+io = _Namespace()
+io.ComfyNode = ComfyNode
+io.NodeOutput = NodeOutput
+ui = _Namespace()
@@ -0,0 +1,5 @@
+"""Placeholder for the SaveAudio node the pack delegates to."""
+
+
+class SaveAudio:
+    pass
@@ -0,0 +1,33 @@
+"""ComfyUI's folder_paths, rooted in a throwaway directory."""
+
+import os
+import tempfile
+
+base_path = tempfile.mkdtemp(prefix="klinter_tests_")
+
+
+def get_input_directory():
+    return os.path.join(base_path, "input")
+
+
+def get_output_directory():
+    return os.path.join(base_path, "output")
+
+
+def get_temp_directory():
+    return os.path.join(base_path, "temp")
+
+
+def get_annotated_filepath(name):
+    return name if os.path.isabs(name) else os.path.join(get_input_directory(), name)
+
+
+def exists_annotated_filepath(name):
+    return os.path.exists(get_annotated_filepath(name))
+
+
+def get_save_image_path(filename_prefix, output_dir, image_width=0, image_height=0):
+    subfolder, filename = os.path.split(filename_prefix)
+    full_output_folder = os.path.join(output_dir, subfolder)
+    os.makedirs(full_output_folder, exist_ok=True)
+    return full_output_folder, filename, 1, subfolder, filename_prefix
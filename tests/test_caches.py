@@ -0,0 +1,154 @@
+"""In-process and on-disk caches shared by the loaders, and the probe memo."""
+
+import os
+import numpy as np
+import pytest
+import torch
+
+
+def tensor(nbytes):
+    return torch.zeros(nbytes, dtype=torch.uint8)
+
+
+def test_lru_cache_evicts_least_recently_used(klinter):
+    cache = klinter.lru_cache.LRUCache(budget_bytes=300)
+    cache.put("a", tensor(100))
+    cache.put("b", tensor(100))
+    cache.put("c", tensor(100))
+    assert cache.get("a") is not None  # a is now the most recent
+    cache.put("d", tensor(100))
+    assert "b" not in cache
+    assert all(key in cache for key in ("a", "c", "d"))
+    stats = cache.stats()
+    assert (stats["entries"], stats["used_bytes"], stats["evictions"]) == (3, 300, 1)
+
+
+def test_lru_cache_counts_tensors_inside_tuples_and_skips_oversized_values(klinter):
+    cache = klinter.lru_cache.LRUCache(budget_bytes=250)
+    cache.put("clip", (tensor(100), [tensor(50)], {"audio": tensor(50)}, "meta"))
+    assert cache.stats()["used_bytes"] == 200
+    cache.put("huge", tensor(251))
+    assert "huge" not in cache
+    assert "clip" in cache
+
+
+def test_get_or_load_calls_the_loader_once(klinter):
+    cache = klinter.video_cache.ClipCache(budget_bytes=1000)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return tensor(10)
+
+    first = cache.get_or_load("k", load)
+    assert cache.get_or_load("k", load) is first
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_clip_cache_budget_from_environment(klinter, monkeypatch):
+    monkeypatch.setenv("KLINTER_CLIP_CACHE_MB", "0.5")
+    assert klinter.video_cache.ClipCache().budget_bytes == 512 * 1024
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.mp4"
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+
+def write_clip(cache, source, count, **params):
+    writer = cache.writer(source, {"fps": 24.0}, **params)
+    for i in range(count):
+        writer.append(np.full((4, 6, 3), i, dtype=np.uint8))
+    writer.commit()
+
+
+def test_frame_disk_cache_round_trip(klinter, tmp_path, source):
+    cache = klinter.video_cache.FrameDiskCache(str(tmp_path / "frames"), budget_bytes=1 << 20)
+    assert cache.open(source, loader="test") is None
+    write_clip(cache, source, 5, loader="test")
+
+    frames, meta = cache.open(source, loader="test")
+    assert frames.shape == (5, 4, 6, 3)
+    assert int(frames[3, 0, 0, 0]) == 3
+    assert (meta["fps"], meta["frame_count"]) == (24.0, 5)
+    # Different decode parameters are a different entry
+    assert cache.open(source, loader="other") is None
+
+
+def test_frame_disk_cache_drops_entries_of_changed_sources(klinter, tmp_path, source):
+    cache = klinter.video_cache.FrameDiskCache(str(tmp_path / "frames"), budget_bytes=1 << 20)
+    write_clip(cache, source, 2, loader="test")
+    with open(source, "ab") as f:
+        f.write(b" edited")
+    assert cache.open(source, loader="test") is None
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_frame_disk_cache_evicts_oldest_beyond_budget(klinter, tmp_path, source):
+    clip_bytes = 3 * 4 * 6 * 3
+    cache = klinter.video_cache.FrameDiskCache(str(tmp_path / "frames"), budget_bytes=2 * clip_bytes)
+    for i in range(3):
+        write_clip(cache, source, 3, take=i)
+        # Recency is the data file's mtime; space the entries apart
+        data_path = cache._paths(cache._hash(source, {"take": i}))[0]
+        os.utime(data_path, (1000 + i, 1000 + i))
+    cache.evict()
+    assert cache.open(source, take=0) is None
+    assert cache.open(source, take=1) is not None
+    assert cache.open(source, take=2) is not None
+
+
+def test_frame_disk_cache_keeps_files_it_cannot_delete(klinter, tmp_path, source, monkeypatch):
+    cache = klinter.video_cache.FrameDiskCache(str(tmp_path / "frames"), budget_bytes=0)
+    real_remove = os.remove
+
+    def locked(path):
+        # Windows refuses to delete a memory-mapped file
+        if path.endswith(".u8"):
+            raise PermissionError(13, "in use", path)
+        real_remove(path)
+
+    monkeypatch.setattr(klinter.video_cache.os, "remove", locked)
+    write_clip(cache, source, 2, loader="test")
+    assert cache.open(source, loader="test") is not None
+
+
+def test_cached_probe_memoizes_per_kind_until_the_file_changes(klinter, source):
+    cached_probe = klinter.video_utils.cached_probe
+    calls = []
+
+    def probe(kind):
+        def run(path):
+            calls.append(kind)
+            return {"kind": kind, "size": os.path.getsize(path)}
+        return run
+
+    assert cached_probe(source, probe("cv2"), "test-cv2")["kind"] == "cv2"
+    assert cached_probe(source, probe("cv2"), "test-cv2")["kind"] == "cv2"
+    # Another kind of probe never receives the first one's dict
+    assert cached_probe(source, probe("ffprobe"), "test-ffprobe")["kind"] == "ffprobe"
+    assert calls == ["cv2", "ffprobe"]
+
+    # Callers get copies they may modify
+    cached_probe(source, probe("cv2"), "test-cv2")["size"] = -1
+    assert cached_probe(source, probe("cv2"), "test-cv2")["size"] == os.path.getsize(source)
+
+    with open(source, "ab") as f:
+        f.write(b"!")
+    assert cached_probe(source, probe("cv2"), "test-cv2")["size"] == os.path.getsize(source)
+    assert calls == ["cv2", "ffprobe", "cv2"]
+
+
+def test_cached_probe_does_not_memoize_failures(klinter, source):
+    calls = []
+
+    def failing(path):
+        calls.append(path)
+        return None
+
+    assert klinter.video_utils.cached_probe(source, failing, "test-failing") is None
+    assert klinter.video_utils.cached_probe(source, failing, "test-failing") is None
+    assert len(calls) == 2
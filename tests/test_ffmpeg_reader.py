@@ -0,0 +1,50 @@
+"""The ffmpeg pipe reader: frame layout, stderr callbacks, failures and interrupts."""
+
+import shutil
+import pytest
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+# 10 frames of a 32x24 test pattern at 10 fps
+TEST_SOURCE = ['-f', 'lavfi', '-i', 'testsrc=size=32x24:rate=10:duration=1']
+
+
+def test_reads_every_frame_at_the_output_size(klinter):
+    reader = klinter.ffmpeg_reader.FFmpegFrameReader(TEST_SOURCE, 32, 24)
+    shapes = [frame.shape for frame in reader]
+    assert shapes == [(24, 32, 3)] * 10
+    assert reader.frames_read == 10
+
+
+def test_on_stderr_sees_showinfo_timestamps(klinter):
+    times = []
+
+    def on_stderr(line):
+        pts_time = klinter.video_utils.showinfo_pts_time(line)
+        if pts_time is not None:
+            times.append(pts_time)
+
+    reader = klinter.ffmpeg_reader.FFmpegFrameReader(TEST_SOURCE + ['-vf', 'showinfo'], 32, 24,
+                                                     loglevel='info', on_stderr=on_stderr)
+    count = sum(1 for _ in reader)
+    assert count == 10
+    assert times == pytest.approx([i / 10 for i in range(10)])
+
+
+def test_ffmpeg_errors_are_raised(klinter, tmp_path):
+    reader = klinter.ffmpeg_reader.FFmpegFrameReader(['-i', str(tmp_path / "missing.mp4")], 32, 24)
+    with pytest.raises(RuntimeError):
+        list(reader)
+
+
+def test_interrupt_stops_the_read(klinter):
+    import comfy.model_management as model_management
+    if not klinter.ffmpeg_reader.HAS_COMFY:
+        pytest.skip("interrupts need comfy.model_management")
+    reader = klinter.ffmpeg_reader.FFmpegFrameReader(TEST_SOURCE, 32, 24)
+    frames = iter(reader)
+    next(frames)
+    model_management.interrupt_current_processing(True)
+    with pytest.raises(klinter.ffmpeg_reader.InterruptProcessingException):
+        next(frames)
+    assert not model_management.processing_interrupted()
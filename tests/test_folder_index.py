@@ -0,0 +1,141 @@
+"""Folder listings: the sidecar index, include/exclude filters and natural sort."""
+
+import os
+import json
+import pytest
+
+
+def touch(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def bump_mtime(path, seconds=10):
+    """Move a file or folder's mtime forward, so filesystems with coarse mtimes see a change."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for name in ("b.png", "a.jpg", "notes.txt", "c.webp"):
+        touch(str(tmp_path / name))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def scandir_calls(klinter, monkeypatch):
+    """Count the directory listings the index makes."""
+    module = klinter.folder_index
+    calls = []
+    real = module.os.scandir
+
+    def counting(path):
+        calls.append(path)
+        return real(path)
+
+    monkeypatch.setattr(module.os, "scandir", counting)
+    return calls
+
+
+def test_lists_images_sorted_and_persists_the_listing(klinter, folder, scandir_calls):
+    index = klinter.folder_index.ImageFolderIndex(folder)
+    assert index.files() == ["a.jpg", "b.png", "c.webp"]
+    assert os.path.isfile(os.path.join(folder, ".klinter_index", "images.json"))
+
+    # A fresh index reads the sidecar and does not list the unchanged folder again
+    scandir_calls.clear()
+    assert klinter.folder_index.ImageFolderIndex(folder).files() == ["a.jpg", "b.png", "c.webp"]
+    assert scandir_calls == []
+
+
+def test_relists_when_the_folder_changes(klinter, folder, scandir_calls):
+    index = klinter.folder_index.ImageFolderIndex(folder)
+    index.files()
+    touch(os.path.join(folder, "d.png"))
+    bump_mtime(folder)
+    scandir_calls.clear()
+    assert index.files() == ["a.jpg", "b.png", "c.webp", "d.png"]
+    assert len(scandir_calls) == 1
+
+
+def test_get_info_probes_once_until_the_file_changes(klinter, folder):
+    index = klinter.folder_index.ImageFolderIndex(folder)
+    index.files()
+    probes = []
+
+    def probe(path):
+        probes.append(path)
+        return {"size": os.path.getsize(path)}
+
+    assert index.get_info("a.jpg", probe) == {"size": 1}
+    assert index.get_info("a.jpg", probe) == {"size": 1}
+    assert len(probes) == 1
+
+    touch(os.path.join(folder, "a.jpg"), b"xyz")
+    bump_mtime(os.path.join(folder, "a.jpg"))
+    assert index.get_info("a.jpg", probe) == {"size": 3}
+    assert len(probes) == 2
+
+
+def test_get_info_without_save_defers_the_write(klinter, folder):
+    index = klinter.folder_index.ImageFolderIndex(folder)
+    index.files()
+    sidecar = index.index_path
+    index.get_info("b.png", lambda path: {"probed": True}, save=False)
+    with open(sidecar, encoding="utf-8") as f:
+        assert json.load(f)["entries"]["b.png"]["info"] is None
+    index.save()
+    with open(sidecar, encoding="utf-8") as f:
+        assert json.load(f)["entries"]["b.png"]["info"] == {"probed": True}
+
+
+def test_recursive_listing_skips_hidden_folders(klinter, folder, scandir_calls):
+    touch(os.path.join(folder, "sub", "e.png"))
+    touch(os.path.join(folder, "sub", "deeper", "f.jpg"))
+    touch(os.path.join(folder, ".hidden", "g.png"))
+    index = klinter.folder_index.ImageFolderIndex(folder, recursive=True)
+    assert index.files() == ["a.jpg", "b.png", "c.webp", "sub/deeper/f.jpg", "sub/e.png"]
+
+    # Unchanged folders are served from the recorded tree
+    scandir_calls.clear()
+    assert klinter.folder_index.ImageFolderIndex(folder, recursive=True).files() == index.files()
+    assert scandir_calls == []
+
+
+def test_stale_version_is_ignored(klinter, folder):
+    index = klinter.folder_index.ImageFolderIndex(folder)
+    index.files()
+    with open(index.index_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "dir_mtime": os.stat(folder).st_mtime_ns, "entries": {}}, f)
+    assert klinter.folder_index.ImageFolderIndex(folder).files() == ["a.jpg", "b.png", "c.webp"]
+
+
+@pytest.mark.parametrize("include, exclude, pattern_type, expected", [
+    ("*.png", "", "glob", ["b.png", "sub/c.png"]),
+    ("*.png, *.jpg", "sub/*", "glob", ["a.jpg", "b.png"]),
+    (r"^sub/", "", "regex", ["sub/c.png"]),
+    ("", r"\.jpg$", "regex", ["b.png", "sub/c.png"]),
+])
+def test_filter_files(klinter, include, exclude, pattern_type, expected):
+    names = ["sub/c.png", "b.png", "a.jpg"]
+    assert klinter.folder_index.filter_files(names, include, exclude, pattern_type) == expected
+
+
+def test_filter_files_rejects_invalid_regex(klinter):
+    with pytest.raises(ValueError, match="Invalid regex"):
+        klinter.folder_index.filter_files(["a.png"], include="(", pattern_type="regex")
+
+
+def test_natural_sort_orders_numbers_by_value(klinter):
+    names = ["img10.png", "img2.png", "Img1.png", "img2b.png"]
+    assert klinter.folder_index.filter_files(names, sort="natural") == [
+        "Img1.png", "img2.png", "img2b.png", "img10.png"]
+
+
+def test_natural_sort_key_keeps_non_decimal_digits_as_text(klinter):
+    # '²' is a digit to str.isdigit() but not a number int() accepts
+    key = klinter.folder_index.natural_sort_key("x1²2.png")
+    assert key == ["x", 1, "²", 2, ".png"]
+    assert klinter.folder_index.filter_files(["x1²2.png", "x3.png"], sort="natural") == ["x1²2.png", "x3.png"]
@@ -0,0 +1,48 @@
+"""A cancelled prompt must stop the video loaders, not send them to the next back end."""
+
+import pytest
+
+
+def interrupting_decode(klinter):
+    def decode(*args, **kwargs):
+        raise klinter.ffmpeg_reader.InterruptProcessingException()
+    return decode
+
+
+@pytest.fixture
+def ffmpeg_then_cv2(klinter, monkeypatch):
+    """Decoder order ffmpeg, cv2 where ffmpeg is interrupted; returns the loader and the cv2 calls."""
+    registry = klinter.video_backends.decoder_registry
+    for name in ("ffmpeg", "cv2"):
+        if not registry.available(name):
+            pytest.skip(f"{name} is not installed")
+    loader = klinter.video_from_folder.VideoFromFolder
+    monkeypatch.setenv("KLINTER_DECODER_ORDER", "ffmpeg,cv2")
+    registry.refresh()
+    cv2_calls = []
+    # Window loads decode, uniform sampling seeks; both pairs are covered
+    for ffmpeg_name, cv2_name in (("_decode_ffmpeg", "_decode_cv2"), ("_sample_ffmpeg", "_sample_cv2")):
+        monkeypatch.setattr(loader, ffmpeg_name, interrupting_decode(klinter))
+        monkeypatch.setattr(loader, cv2_name, lambda *args, **kwargs: cv2_calls.append(args))
+    yield loader, cv2_calls
+    monkeypatch.delenv("KLINTER_DECODER_ORDER")
+    registry.refresh()
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"disk_cache": True},
+    {"sampling": "uniform"},
+])
+def test_interrupt_is_not_caught_by_back_end_fallback(klinter, clip, ffmpeg_then_cv2, kwargs):
+    loader, cv2_calls = ffmpeg_then_cv2
+    with pytest.raises(klinter.ffmpeg_reader.InterruptProcessingException):
+        loader.load_video_frames(clip, **kwargs)
+    assert cv2_calls == []
+
+
+def test_prefetcher_reports_an_interrupted_load(klinter):
+    prefetcher = klinter.video_utils.Prefetcher()
+    prefetcher.submit("next", interrupting_decode(klinter))
+    with pytest.raises(klinter.ffmpeg_reader.InterruptProcessingException):
+        prefetcher.take("next")
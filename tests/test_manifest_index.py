@@ -0,0 +1,76 @@
+"""Manifest listings: record parsing, paging and the persisted offsets file."""
+
+import os
+import json
+import pytest
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+@pytest.fixture
+def manifest_index(klinter):
+    return klinter.manifest_index.ManifestIndex
+
+
+def test_plain_list_skips_blank_lines_and_comments(manifest_index, tmp_path):
+    path = write(tmp_path / "list.txt", "# frames\na.png\n\n  b.png  \n/abs/c.png\n")
+    index = manifest_index(path)
+    assert len(index) == 3
+    assert list(index) == [str(tmp_path / "a.png"), str(tmp_path / "b.png"), "/abs/c.png"]
+
+
+def test_csv_uses_the_path_column_of_a_header(manifest_index, tmp_path):
+    path = write(tmp_path / "set.csv", "caption,file_path\n\"a, b\",x/1.png\nsecond,x/2.png\n")
+    assert list(manifest_index(path)) == [str(tmp_path / "x" / "1.png"), str(tmp_path / "x" / "2.png")]
+
+
+def test_csv_without_header_uses_the_first_column(manifest_index, tmp_path):
+    path = write(tmp_path / "set.csv", "1.png,cat\n2.png,dog\n")
+    assert list(manifest_index(path)) == [str(tmp_path / "1.png"), str(tmp_path / "2.png")]
+
+
+def test_jsonl_accepts_strings_and_objects(manifest_index, tmp_path):
+    lines = [json.dumps("a.png"), json.dumps({"image": "b.png", "caption": "x"})]
+    path = write(tmp_path / "set.jsonl", "\n".join(lines) + "\n")
+    assert list(manifest_index(path)) == [str(tmp_path / "a.png"), str(tmp_path / "b.png")]
+
+    write(path, json.dumps({"caption": "no path"}) + "\n")
+    with pytest.raises(ValueError, match="none of the keys"):
+        manifest_index(path)[0]
+
+
+def test_indexing_and_slicing(manifest_index, tmp_path):
+    path = write(tmp_path / "list.txt", "".join(f"{i}.png\n" for i in range(10)))
+    index = manifest_index(path)
+    assert index[3] == str(tmp_path / "3.png")
+    assert index[-1] == str(tmp_path / "9.png")
+    assert index[8:20] == [str(tmp_path / "8.png"), str(tmp_path / "9.png")]
+    assert index[0:6:2] == [str(tmp_path / f"{i}.png") for i in (0, 2, 4)]
+    assert index[5:5] == []
+    with pytest.raises(IndexError):
+        index[10]
+
+
+def test_offsets_are_persisted_and_rebuilt_on_change(manifest_index, tmp_path, monkeypatch):
+    path = write(tmp_path / "list.txt", "a.png\nb.png\n")
+    assert len(manifest_index(path)) == 2
+    assert os.path.isfile(tmp_path / ".klinter_index" / "list.txt.offsets")
+
+    # A new instance maps the offsets file instead of scanning the manifest
+    monkeypatch.setattr(manifest_index, "_build", lambda self, stamp: pytest.fail("manifest rescanned"))
+    assert manifest_index(path)[1] == str(tmp_path / "b.png")
+    monkeypatch.undo()
+
+    write(path, "a.png\nb.png\nc.png\n")
+    assert list(manifest_index(path))[-1] == str(tmp_path / "c.png")
+
+
+def test_is_manifest(klinter, tmp_path):
+    path = write(tmp_path / "list.txt", "a.png\n")
+    assert klinter.manifest_index.is_manifest(path)
+    assert not klinter.manifest_index.is_manifest(str(tmp_path))
+    assert not klinter.manifest_index.is_manifest(str(tmp_path / "missing.csv"))
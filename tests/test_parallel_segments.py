@@ -0,0 +1,33 @@
+"""Parallel segment decoding must return the serial path's frames, in the same order."""
+
+import pytest
+import torch
+
+# Frames in the clip fixture (conftest.CLIP_FRAMES)
+FRAMES = 60
+
+
+@pytest.mark.parametrize("backend", ["cv2", "ffmpeg"])
+@pytest.mark.parametrize("stride", [1, 3])
+def test_parallel_matches_serial(klinter, clip, pinned_backend, monkeypatch, backend, stride):
+    pinned_backend(backend)
+    loader = klinter.video_from_folder.VideoFromFolder
+
+    # Record what the parallel path returned, so a silent serial fallback fails the test
+    load_parallel = loader._load_parallel
+    results = []
+
+    def record(*args, **kwargs):
+        results.append(load_parallel(*args, **kwargs))
+        return results[-1]
+
+    monkeypatch.setattr(loader, "_load_parallel", record)
+
+    serial = loader.load_video_frames(clip, frame_stride=stride)
+    parallel = loader.load_video_frames(clip, frame_stride=stride, parallel_segments=4)
+
+    assert results and results[0] is not None
+    assert serial[0].shape[0] == len(range(0, FRAMES, stride))
+    assert parallel[0].shape == serial[0].shape
+    assert parallel[4] == serial[4]
+    assert torch.equal(parallel[0], serial[0])
@@ -0,0 +1,251 @@
+"""Registry of the video decoding back ends available to the klinter video nodes."""
+
+import os
+import time
+import shutil
+import threading
+import subprocess
+from .video_utils import estimate_frame_count, resolve_frame_window
+
+# Default preference before any throughput has been measured
+DEFAULT_ORDER = ["cv2", "imageio", "ffmpeg"]
+
+# Frames decoded per back end by the throughput benchmark
+BENCHMARK_FRAMES = 48
+
+# Short-side limits of the resolution classes throughput is measured per
+RESOLUTION_CLASSES = ((576, "sd"), (1088, "hd"))
+
+
+class _CountingSink:
+    """Frame sink that discards frames, used to time decoders without allocating outputs."""
+
+    def __init__(self):
+        self.count = 0
+
+    def append(self, frame):
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+def _tool_version(executable: str) -> str:
+    """First line of `<tool> -version`, or None if the tool cannot run."""
+    try:
+        result = subprocess.run([executable, '-version'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return result.stdout.splitlines()[0].strip()
+
+
+def _cv2_video_io(build_info: str) -> dict:
+    """Parse the 'Video I/O' section of cv2.getBuildInformation() into {name: value}."""
+    flags = {}
+    in_section = False
+    for line in build_info.splitlines():
+        stripped = line.strip()
+        if stripped == "Video I/O:":
+            in_section = True
+            continue
+        if in_section:
+            if not stripped or not line.startswith("    "):
+                break
+            name, _, value = stripped.partition(":")
+            flags[name.strip()] = value.strip()
+    return flags
+
+
+class DecoderRegistry:
+    """Capabilities of the installed video tools, resolved once and refreshable.
+
+    refresh() records which back ends can decode (cv2 and its Video I/O build
+    flags, imageio and its video plugins, the ffmpeg/ffprobe executables and
+    their versions). rank() times each available decoder on a short window of
+    the first real clip of each class (container and resolution) and orders
+    later loads of that class fastest first. Set KLINTER_DECODER_ORDER (e.g.
+    "ffmpeg,cv2") to pin the order and skip the benchmark.
+    """
+
+    def __init__(self):
+        self.capabilities = {}
+        self.throughput = {}
+        self._pinned = None
+        self._orders = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> dict:
+        """Re-detect the installed back ends and forget measured throughput.
+
+        Returns:
+            dict: Capabilities keyed by back end name
+        """
+        capabilities = {}
+
+        try:
+            import cv2
+            capabilities['cv2'] = {
+                'available': True,
+                'version': cv2.__version__,
+                'video_io': _cv2_video_io(cv2.getBuildInformation()),
+            }
+        except ImportError:
+            capabilities['cv2'] = {'available': False}
+
+        try:
+            import imageio
+            plugins = {}
+            try:
+                import imageio_ffmpeg
+                plugins['ffmpeg'] = imageio_ffmpeg.__version__
+            except ImportError:
+                pass
+            try:
+                import av
+                plugins['pyav'] = av.__version__
+            except ImportError:
+                pass
+            # imageio alone cannot read video without one of its video plugins
+            capabilities['imageio'] = {
+                'available': bool(plugins),
+                'version': imageio.__version__,
+                'plugins': plugins,
+            }
+        except ImportError:
+            capabilities['imageio'] = {'available': False}
+
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None and 'ffmpeg' in capabilities['imageio'].get('plugins', {}):
+            # Fall back to the binary bundled with imageio-ffmpeg
+            try:
+                import imageio_ffmpeg
+                ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+            except Exception:
+                ffmpeg = None
+        ffmpeg_version = _tool_version(ffmpeg) if ffmpeg else None
+        capabilities['ffmpeg'] = {
+            'available': ffmpeg_version is not None,
+            'path': ffmpeg,
+            'version': ffmpeg_version,
+        }
+
+        ffprobe = shutil.which('ffprobe')
+        ffprobe_version = _tool_version(ffprobe) if ffprobe else None
+        capabilities['ffprobe'] = {
+            'available': ffprobe_version is not None,
+            'path': ffprobe,
+            'version': ffprobe_version,
+        }
+
+        with self._lock:
+            self.capabilities = capabilities
+            self.throughput = {}
+            self._pinned = self._pinned_order()
+            self._orders = {}
+        return capabilities
+
+    def _pinned_order(self):
+        """Order from KLINTER_DECODER_ORDER, or None to benchmark."""
+        pinned = os.environ.get("KLINTER_DECODER_ORDER", "")
+        names = [name.strip() for name in pinned.split(",") if name.strip()]
+        return [name for name in names if self.available(name)] or None
+
+    def available(self, name: str) -> bool:
+        """Whether a back end or tool ('cv2', 'imageio', 'ffmpeg', 'ffprobe') can be used."""
+        return self.capabilities.get(name, {}).get('available', False)
+
+    @property
+    def ffmpeg(self) -> str:
+        """Resolved ffmpeg executable, or None."""
+        return self.capabilities['ffmpeg']['path'] if self.available('ffmpeg') else None
+
+    @property
+    def ffprobe(self) -> str:
+        """Resolved ffprobe executable, or None."""
+        return self.capabilities['ffprobe']['path'] if self.available('ffprobe') else None
+
+    @staticmethod
+    def clip_class(video_path: str, info: dict) -> tuple:
+        """Container and resolution class whose clips share one measured order."""
+        short_side = min(info.get('width', 0), info.get('height', 0))
+        resolution = next((name for limit, name in RESOLUTION_CLASSES if short_side <= limit), "uhd")
+        return os.path.splitext(video_path)[1].lower(), resolution
+
+    def order(self, video_path: str = None, info: dict = None) -> list:
+        """Available decoder names, fastest first once rank() has measured the clip's class."""
+        with self._lock:
+            order = self._pinned
+            if order is None and video_path is not None:
+                order = self._orders.get(self.clip_class(video_path, info))
+        return [name for name in order or DEFAULT_ORDER if self.available(name)]
+
+    def rank(self, decoders: dict, video_path: str, info: dict) -> list:
+        """Benchmark the decoders on a short window of a clip, once per class and refresh.
+
+        Clips of BENCHMARK_FRAMES frames or fewer are too short to time and
+        keep the current order for their class.
+
+        Args:
+            decoders: {name: decode function} using the loaders' decoder signature
+            video_path: Clip to decode
+            info: Probed metadata of the clip
+
+        Returns:
+            list: Available decoder names, fastest first
+        """
+        if estimate_frame_count(info) <= BENCHMARK_FRAMES:
+            return self.order(video_path, info)
+        clip_class = self.clip_class(video_path, info)
+        with self._lock:
+            order = self._pinned or self._orders.get(clip_class)
+            if order is not None:
+                return [name for name in order if self.available(name)]
+
+            window = resolve_frame_window(info['fps'], max_frames=BENCHMARK_FRAMES,
+                                          total_frames=info.get('frame_count', 0))
+            throughput = {}
+            for name in DEFAULT_ORDER:
+                if name not in decoders or not self.available(name):
+                    continue
+                sink = _CountingSink()
+                started = time.perf_counter()
+                try:
+                    decoders[name](video_path, info, window, sink=sink)
+                except Exception as e:
+                    print(f"{name} failed decoder benchmark: {e}")
+                elapsed = time.perf_counter() - started
+                throughput[name] = len(sink) / elapsed if len(sink) and elapsed > 0 else 0.0
+
+            # Stable sort keeps the default preference between equally fast decoders
+            order = sorted(throughput, key=lambda name: -throughput[name])
+            if not self._orders:
+                # The first measurement after a refresh also reports what was detected
+                print(f"Video back ends: {self.summary()}")
+            self._orders[clip_class] = order
+            self.throughput[clip_class] = throughput
+            print(f"Video decoder throughput ({' '.join(clip_class)}): " + ", ".join(
+                f"{name} {throughput[name]:.0f} fps" for name in order))
+            return list(order)
+
+    def summary(self) -> str:
+        """One-line description of the detected back ends."""
+        parts = []
+        for name in ("cv2", "imageio", "ffmpeg", "ffprobe"):
+            capability = self.capabilities.get(name, {})
+            if not capability.get('available'):
+                parts.append(f"{name}: missing")
+            elif name == "imageio":
+                parts.append(f"imageio {capability['version']} ({', '.join(capability['plugins'])})")
+            elif name == "cv2":
+                parts.append(f"cv2 {capability['version']} (FFMPEG: {capability['video_io'].get('FFMPEG', '?')})")
+            else:
+                parts.append(f"{name} {capability['path']}")
+        return "; ".join(parts)
+
+
+# Resolved once when the pack loads; call decoder_registry.refresh() after
+# installing or removing a tool
+decoder_registry = DecoderRegistry()
@@ -0,0 +1,245 @@
+"""Node for loading several videos from a folder concurrently."""
+
+import os
+import random
+import torch
+from concurrent.futures import ThreadPoolExecutor
+from comfy_api.latest import io
+from .ffmpeg_reader import InterruptProcessingException
+from .tensor_utils import OUTPUT_DTYPES
+from .video_cache import clip_cache, clip_key, proxy_cache
+from .video_from_folder import SAMPLING_MODES, VideoFromFolder
+from .video_utils import RESAMPLE_FILTERS
+
+
+class VideoBatchFromFolder(io.ComfyNode):
+    """Load K clips from a folder in one run, decoding them on a thread pool.
+
+    The decoders spend their time in native code (cv2) or in ffmpeg
+    subprocesses, so threads decode clips in parallel without the start-up
+    and transfer cost of worker processes.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        """Define the schema for the video batch from folder node.
+
+        Returns:
+            io.Schema: Node schema with inputs and outputs
+        """
+        return io.Schema(
+            node_id="VideoBatchFromFolder",
+            display_name="Video Batch From Folder - Klinter",
+            category="klinter",
+            description="Load several videos from a folder at once, decoding them concurrently",
+            inputs=[
+                io.String.Input("folder_path", default=""),
+                io.Int.Input("seed", default=0, min=0, max=0xffffffffffffffff),
+                io.Combo.Input("seed_mode", options=["increment", "random", "fixed"],
+                               tooltip="increment: consecutive clips, batch N starts at clip N * batch_size; "
+                                       "random: distinct seeded clips; fixed: consecutive clips from seed_offset"),
+                io.Int.Input("batch_size", default=4, min=1, max=1024, step=1,
+                             tooltip="Number of clips to load"),
+                io.Combo.Input("output_mode", options=["list", "padded"], default="list",
+                               tooltip="list: one frames item per clip; padded: one batch of "
+                                       "batch_size * longest clip frames, zero padded (needs equal sizes)"),
+                io.Int.Input("seed_offset", default=0, min=0, step=1, optional=True),
+                io.Int.Input("workers", default=0, min=0, max=256, step=1, optional=True,
+                             tooltip="Clips decoded at the same time (0 = number of CPU cores)"),
+                io.Combo.Input("window_unit", options=["frames", "seconds"], default="frames", optional=True),
+                io.Float.Input("start", default=0.0, min=0.0, step=0.1, optional=True,
+                               tooltip="Window start in window_unit"),
+                io.Float.Input("end", default=0.0, min=0.0, step=0.1, optional=True,
+                               tooltip="Window end in window_unit (0 = end of video)"),
+                io.Int.Input("frame_stride", default=1, min=1, step=1, optional=True,
+                             tooltip="Keep every Nth frame of the window"),
+                io.Int.Input("max_frames", default=0, min=0, step=1, optional=True,
+                             tooltip="Maximum number of frames per clip (0 = no limit)"),
+                io.Int.Input("target_width", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Decode width (0 = from height / source)"),
+                io.Int.Input("target_height", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Decode height (0 = from width / source)"),
+                io.Int.Input("max_side", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Downscale so the longer side fits (0 = no limit)"),
+                io.Combo.Input("resample", options=RESAMPLE_FILTERS, default="area", optional=True),
+                io.Boolean.Input("disk_cache", default=False, optional=True,
+                                 tooltip="Keep decoded frames in a memory-mapped on-disk cache for reuse"),
+                io.Combo.Input("output_dtype", options=list(OUTPUT_DTYPES), default="float32", optional=True,
+                               tooltip="Precision of the frames output; float16/bfloat16 halve memory"),
+                io.Combo.Input("sampling", options=SAMPLING_MODES, default="window", optional=True,
+                               tooltip="window: every frame_stride-th frame; keyframes: only the key frames "
+                                       "of the window; uniform: num_samples evenly spaced frames"),
+                io.Int.Input("num_samples", default=8, min=1, max=4096, step=1, optional=True,
+                             tooltip="Number of frames taken in uniform sampling"),
+                io.Boolean.Input("proxy", default=False, optional=True,
+                                 tooltip="Decode cached 480p MJPEG proxies of the videos for previews "
+                                         "(KLINTER_PROXY=0/1 overrides this for every node)"),
+            ],
+            outputs=[
+                io.Image.Output(display_name="frames", is_output_list=True),
+                io.Custom("LENGTHS").Output(display_name="lengths"),
+                io.String.Output(display_name="video_paths"),
+                io.Custom("VIDEO_METADATA").Output(display_name="metadata"),
+            ]
+        )
+
+    @classmethod
+    def fingerprint_inputs(cls, folder_path, seed, seed_mode, batch_size, output_mode,
+                           seed_offset=0, **kwargs):
+        """Tell ComfyUI when the node output changes."""
+        # For increment mode, always mark as changed so it advances each run
+        if seed_mode == "increment":
+            return float("NaN")
+        try:
+            signature = VideoFromFolder.get_source_index(folder_path).signature()
+        except OSError:
+            signature = ""
+        proxy = proxy_cache.enabled(kwargs.get('proxy', False))
+        return f"{folder_path}_{seed}_{seed_mode}_{seed_offset}_{batch_size}_{output_mode}_{proxy}_{signature}"
+
+    @classmethod
+    def select_video_indices(cls, seed, seed_mode, seed_offset, batch_size, num_videos):
+        """Pick the indices of the clips in this batch.
+
+        Returns:
+            list: Distinct video indices, at most num_videos of them
+        """
+        count = min(batch_size, num_videos)
+        if seed_mode == "random":
+            rng = random.Random(seed + seed_offset)
+            return rng.sample(range(num_videos), count)
+        if seed_mode == "increment":
+            # Consecutive batches tile the folder: run N covers clips N*K .. N*K+K-1
+            first = seed * batch_size + seed_offset
+        else:  # fixed
+            first = seed_offset
+        return [(first + i) % num_videos for i in range(count)]
+
+    @classmethod
+    def _load_clip(cls, video_path, decode_kwargs):
+        """Decode one clip through the shared clip cache."""
+        key = clip_key(video_path, **decode_kwargs)
+        return clip_cache.get_or_load(key, lambda: VideoFromFolder.load_video_frames(video_path, **decode_kwargs))
+
+    @classmethod
+    def _pad_clips(cls, clips):
+        """Stack clips into one zero padded batch of len(clips) * longest frames.
+
+        Returns:
+            torch.Tensor: Frames with clip i at rows [i * longest, i * longest + length_i)
+        """
+        shapes = {tuple(clip.shape[1:]) for clip in clips}
+        if len(shapes) > 1:
+            raise ValueError(f"Padded output needs clips of one size, got {sorted(shapes)}; "
+                             "set target_width/target_height or use the list output mode")
+        longest = max(clip.shape[0] for clip in clips)
+        out = torch.zeros((len(clips) * longest, *clips[0].shape[1:]), dtype=clips[0].dtype)
+        for i, clip in enumerate(clips):
+            out[i * longest:i * longest + clip.shape[0]] = clip
+        return out
+
+    @classmethod
+    def execute(cls, folder_path, seed, seed_mode, batch_size, output_mode, seed_offset=0, workers=0,
+                window_unit="frames", start=0.0, end=0.0, frame_stride=1, max_frames=0,
+                target_width=0, target_height=0, max_side=0, resample="area", disk_cache=False,
+                output_dtype="float32", sampling="window", num_samples=8, proxy=False) -> io.NodeOutput:
+        """Load a batch of videos from a folder concurrently.
+
+        Args:
+            folder_path: Path to folder containing video files
+            seed: Seed value for selection
+            seed_mode: 'increment', 'random', or 'fixed'
+            batch_size: Number of clips to load
+            output_mode: 'list' for one frames item per clip, 'padded' for one zero padded batch
+            seed_offset: Additional offset to apply to the selection
+            workers: Clips decoded at the same time (0 = CPU core count)
+            window_unit: Whether start/end are in 'frames' or 'seconds'
+            start: Start of the frame window to decode
+            end: End of the frame window to decode (0 = end of video)
+            frame_stride: Keep every Nth frame of the window
+            max_frames: Maximum number of frames per clip (0 = no limit)
+            target_width: Decode width (0 = keep aspect / source)
+            target_height: Decode height (0 = keep aspect / source)
+            max_side: Downscale so the longer side fits (0 = no limit)
+            resample: Resampling filter for decode-time downscaling
+            disk_cache: Serve frames from the memory-mapped on-disk clip cache
+            output_dtype: Precision of the frames output
+            sampling: 'window', 'keyframes' or 'uniform'
+            num_samples: Frames taken in uniform sampling
+            proxy: Decode the low-resolution proxies instead of the sources
+
+        Returns:
+            io.NodeOutput: Frames (list of clips, or one padded batch), per-clip
+            lengths tensor, newline separated video paths, per-clip metadata
+        """
+        video_files = VideoFromFolder.get_video_files(folder_path)
+        indices = cls.select_video_indices(seed, seed_mode, seed_offset, batch_size, len(video_files))
+        paths = [os.path.join(folder_path, video_files[index]) for index in indices]
+
+        decode_kwargs = {
+            'start': start,
+            'end': end,
+            'window_unit': window_unit,
+            'frame_stride': frame_stride,
+            'max_frames': max_frames,
+            'target_width': target_width,
+            'target_height': target_height,
+            'max_side': max_side,
+            'resample': resample,
+            'disk_cache': disk_cache,
+            'output_dtype': output_dtype,
+            'sampling': sampling,
+            'num_samples': num_samples,
+            'proxy': proxy_cache.enabled(proxy),
+        }
+
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        print(f"Loading {len(paths)} of {len(video_files)} videos with {workers} workers "
+              f"(seed: {seed}, mode: {seed_mode}, offset: {seed_offset})")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="klinter-batch") as pool:
+            futures = [pool.submit(cls._load_clip, path, decode_kwargs) for path in paths]
+
+        clips = []
+        metadata = []
+        for index, path, future in zip(indices, paths, futures):
+            try:
+                frames, fps, duration, frame_count, source_indices, timestamps, _ = future.result()
+            except InterruptProcessingException:
+                raise
+            except Exception as e:
+                # One unreadable file should not sink a whole ingestion batch
+                print(f"Skipping {path}: {e}")
+                continue
+            clips.append(frames)
+            metadata.append({
+                'video_path': path,
+                'video_index': index,
+                'fps': fps,
+                'duration': duration,
+                'frame_count': frame_count,
+                'source_indices': source_indices,
+                'timestamps': timestamps,
+            })
+
+        if not clips:
+            raise ValueError(f"None of the {len(paths)} selected videos could be loaded")
+
+        lengths = torch.tensor([clip.shape[0] for clip in clips], dtype=torch.int64)
+        frames = [cls._pad_clips(clips)] if output_mode == "padded" else clips
+        video_paths = "\n".join(item['video_path'] for item in metadata)
+
+        return io.NodeOutput(frames, lengths, video_paths, metadata)
+
+
+# Register the node
+NODE_CLASS_MAPPINGS = {
+    "VideoBatchFromFolder": VideoBatchFromFolder
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "VideoBatchFromFolder": "Video Batch From Folder - Klinter"
+}
+
+# Export the class
+__all__ = ['VideoBatchFromFolder']
@@ -0,0 +1,356 @@
+"""In-process caches for decoded video clips shared by the klinter video loaders."""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import subprocess
+import numpy as np
+import folder_paths
+from .lru_cache import LRUCache
+
+DEFAULT_CLIP_CACHE_MB = 2048
+DEFAULT_FRAME_CACHE_MB = 20480
+DEFAULT_PROXY_CACHE_MB = 20480
+DEFAULT_PROXY_HEIGHT = 480
+
+# Root for the pack's persistent caches (not ComfyUI's temp dir, which is
+# wiped on startup)
+CACHE_ROOT = os.environ.get("KLINTER_CACHE_DIR", os.path.join(folder_paths.base_path, "klinter_cache"))
+
+
+def clip_key(video_path: str, **params) -> tuple:
+    """Build a cache key from a file's identity and its decode parameters.
+
+    Args:
+        video_path: Path to the source video
+        **params: Decode parameters (window, fps, scale, dtype, ...)
+
+    Returns:
+        tuple: Hashable key that changes when the file or parameters change
+    """
+    stat = os.stat(video_path)
+    return (os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size,
+            tuple(sorted(params.items())))
+
+
+def _evict_lru(cache_dir: str, suffix: str, budget_bytes: int, remove):
+    """Call remove(stem) on the oldest-mtime files with suffix until the rest fit the budget.
+
+    remove returns False for entries it could not delete (files still in use),
+    which keep counting against the budget.
+    """
+    entries = []
+    total = 0
+    try:
+        scan = os.scandir(cache_dir)
+    except FileNotFoundError:
+        return
+    with scan as it:
+        for entry in it:
+            if not entry.name.endswith(suffix):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.name[:-len(suffix)]))
+            total += stat.st_size
+    entries.sort()
+    for _, size, stem in entries:
+        if total <= budget_bytes:
+            break
+        if remove(stem):
+            total -= size
+
+
+class ClipCache(LRUCache):
+    """LRU cache of decoded clips, sized by KLINTER_CLIP_CACHE_MB megabytes unless given a budget."""
+
+    def __init__(self, budget_bytes: int = None):
+        if budget_bytes is None:
+            budget_mb = float(os.environ.get("KLINTER_CLIP_CACHE_MB", DEFAULT_CLIP_CACHE_MB))
+            budget_bytes = int(budget_mb * 1024 * 1024)
+        super().__init__(budget_bytes)
+
+
+# Shared by every video loader node in the pack
+clip_cache = ClipCache()
+
+
+class DiskFrameWriter:
+    """Frame sink that streams decoded uint8 frames into a raw cache file.
+
+    Has the same append() interface as FrameBuffer, so any decoder can write
+    to disk instead of to a tensor. Nothing is visible in the cache until
+    commit() succeeds.
+    """
+
+    def __init__(self, cache: "FrameDiskCache", key_hash: str, meta: dict):
+        self.cache = cache
+        self.key_hash = key_hash
+        self.meta = meta
+        self.count = 0
+        self.shape = None
+        self.data_path, self.meta_path = cache._paths(key_hash)
+        self._tmp_path = f"{self.data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(cache.cache_dir, exist_ok=True)
+        self._file = open(self._tmp_path, 'wb')
+
+    def append(self, frame):
+        """Append one HxWxC uint8 frame to the raw file."""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self.shape is None:
+            self.shape = frame.shape
+        elif frame.shape != self.shape:
+            raise ValueError(f"Frame {self.count} has shape {frame.shape}, expected {self.shape}")
+        self._file.write(memoryview(frame).cast('B'))
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def commit(self):
+        """Publish the frames and their metadata header, then enforce the size cap."""
+        self._file.close()
+        if self.count == 0:
+            os.remove(self._tmp_path)
+            return
+        meta = dict(self.meta, frame_count=self.count, shape=[self.count, *self.shape])
+        try:
+            os.replace(self._tmp_path, self.data_path)
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            # e.g. a stale clip of the same key is still mapped on Windows;
+            # the caller then finds no entry and decodes directly
+            print(f"Could not publish cached clip {self.data_path}: {e}")
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+            return
+        self.cache.evict()
+
+    def abort(self):
+        """Discard a partially written clip."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class FrameDiskCache:
+    """Size-capped directory of decoded uint8 clips stored as memory-mappable raw files.
+
+    Each entry is a raw (N, H, W, C) uint8 file plus a small JSON header with
+    the shape and the source file's mtime and size. Loads map the file and
+    convert only the frames they need, without touching the codec. Entries
+    are invalidated when the source changes and evicted least-recently-used
+    once the directory exceeds KLINTER_FRAME_CACHE_MB megabytes.
+    """
+
+    def __init__(self, cache_dir: str = None, budget_bytes: int = None):
+        if cache_dir is None:
+            cache_dir = os.environ.get("KLINTER_FRAME_CACHE_DIR", os.path.join(CACHE_ROOT, "frames"))
+        if budget_bytes is None:
+            budget_mb = float(os.environ.get("KLINTER_FRAME_CACHE_MB", DEFAULT_FRAME_CACHE_MB))
+            budget_bytes = int(budget_mb * 1024 * 1024)
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(video_path: str, params: dict) -> str:
+        key = repr((os.path.abspath(video_path), tuple(sorted(params.items()))))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _paths(self, key_hash: str):
+        base = os.path.join(self.cache_dir, key_hash)
+        return base + ".u8", base + ".json"
+
+    def _remove(self, key_hash: str) -> bool:
+        # Windows refuses to delete a clip that is still memory-mapped; it stays
+        # until a later eviction finds it unused
+        for path in self._paths(key_hash):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Could not remove cached clip {path}: {e}")
+                return False
+        return True
+
+    def open(self, video_path: str, **params):
+        """Map a cached clip if it exists and its source is unchanged.
+
+        Args:
+            video_path: Path to the source video
+            **params: Decode parameters the clip was cached with
+
+        Returns:
+            tuple: (np.memmap of shape (N, H, W, C), metadata dict), or None
+        """
+        key_hash = self._hash(video_path, params)
+        data_path, meta_path = self._paths(key_hash)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            stat = os.stat(video_path)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('source_mtime') != stat.st_mtime_ns or meta.get('source_size') != stat.st_size:
+            self._remove(key_hash)
+            return None
+
+        try:
+            # Copy-on-write mapping: pages load lazily and the file is never modified
+            frames = np.memmap(data_path, dtype=np.uint8, mode='c', shape=tuple(meta['shape']))
+        except (OSError, ValueError):
+            self._remove(key_hash)
+            return None
+        # Recency for LRU eviction is the data file's mtime
+        os.utime(data_path)
+        return frames, meta
+
+    def writer(self, video_path: str, meta: dict = None, **params) -> DiskFrameWriter:
+        """Start writing a clip for video_path decoded with params.
+
+        Args:
+            video_path: Path to the source video
+            meta: Extra metadata to store in the header (fps, ...)
+            **params: Decode parameters the clip is cached with
+
+        Returns:
+            DiskFrameWriter: Sink to pass to a decoder, then commit() or abort()
+        """
+        stat = os.stat(video_path)
+        header = dict(meta or {})
+        header.update({
+            'source': os.path.abspath(video_path),
+            'source_mtime': stat.st_mtime_ns,
+            'source_size': stat.st_size,
+            'params': params,
+            'created': time.time(),
+        })
+        return DiskFrameWriter(self, self._hash(video_path, params), header)
+
+    def evict(self):
+        """Remove least-recently-used clips until the directory fits the budget."""
+        with self._lock:
+            _evict_lru(self.cache_dir, ".u8", self.budget_bytes, self._remove)
+
+
+# Shared by every video loader node in the pack
+frame_disk_cache = FrameDiskCache()
+
+
+class ProxyCache:
+    """Size-capped directory of low-resolution, intra-frame proxies of source videos.
+
+    A proxy is the source scaled so its short side is at most
+    KLINTER_PROXY_HEIGHT pixels (480 by default) and re-encoded as MJPEG
+    with PCM audio, keeping every frame and the frame rate. Every frame is a
+    keyframe, so seeks and windows are cheap, and loaders can decode it
+    instead of the 4K original while iterating on a graph. Proxies are keyed
+    on the source's path, mtime and size and evicted least-recently-used
+    beyond KLINTER_PROXY_CACHE_MB megabytes.
+
+    KLINTER_PROXY overrides the nodes' proxy toggles: "0" keeps every load at
+    full resolution (production), "1" proxies every load.
+    """
+
+    def __init__(self, cache_dir: str = None, budget_bytes: int = None, height: int = None):
+        if cache_dir is None:
+            cache_dir = os.environ.get("KLINTER_PROXY_DIR", os.path.join(CACHE_ROOT, "proxies"))
+        if budget_bytes is None:
+            budget_mb = float(os.environ.get("KLINTER_PROXY_CACHE_MB", DEFAULT_PROXY_CACHE_MB))
+            budget_bytes = int(budget_mb * 1024 * 1024)
+        if height is None:
+            height = int(os.environ.get("KLINTER_PROXY_HEIGHT", DEFAULT_PROXY_HEIGHT))
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+        self.height = height
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @staticmethod
+    def enabled(requested: bool) -> bool:
+        """Resolve a node's proxy toggle against the KLINTER_PROXY override."""
+        override = os.environ.get("KLINTER_PROXY", "").strip().lower()
+        if override in ("0", "false", "off", "no"):
+            return False
+        if override in ("1", "true", "on", "yes"):
+            return True
+        return bool(requested)
+
+    def contains(self, path: str) -> bool:
+        """Whether path is a proxy in this cache rather than a source video."""
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.cache_dir)
+
+    def _proxy_path(self, video_path: str) -> str:
+        stat = os.stat(video_path)
+        key = repr((os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size, self.height))
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".avi")
+
+    def _remove(self, stem: str) -> bool:
+        path = os.path.join(self.cache_dir, stem + ".avi")
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # A proxy another node is still reading cannot be deleted on Windows
+            print(f"Could not remove proxy {path}: {e}")
+            return False
+        return True
+
+    def get(self, video_path: str, executable: str = 'ffmpeg') -> str:
+        """Return the proxy of a video, transcoding it on first use.
+
+        Args:
+            video_path: Path to the source video
+            executable: ffmpeg binary used for the transcode
+
+        Returns:
+            str: Path of the proxy file
+        """
+        proxy_path = self._proxy_path(video_path)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(proxy_path, threading.Lock())
+        # Concurrent loads of one source wait for a single transcode
+        with key_lock:
+            if os.path.exists(proxy_path):
+                # Recency for LRU eviction is the proxy's mtime
+                os.utime(proxy_path)
+                return proxy_path
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{proxy_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            # Short side capped at the proxy height, long side even, never upscaled
+            scale = (f"scale=w='if(gt(iw,ih),-2,min(iw,{self.height}))'"
+                     f":h='if(gt(iw,ih),min(ih,{self.height}),-2)'")
+            cmd = [executable, '-hide_banner', '-nostdin', '-loglevel', 'error', '-y',
+                   '-i', video_path, '-map', '0:v:0', '-map', '0:a:0?', '-vf', scale,
+                   '-c:v', 'mjpeg', '-q:v', '3', '-pix_fmt', 'yuvj420p', '-vsync', '0',
+                   '-c:a', 'pcm_s16le', '-f', 'avi', tmp_path]
+            print(f"Creating proxy of {os.path.basename(video_path)}")
+            result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True)
+            if result.returncode != 0:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise RuntimeError(f"FFmpeg proxy error: {result.stderr.decode('utf-8', 'replace').strip()}")
+            os.replace(tmp_path, proxy_path)
+
+        with self._lock:
+            _evict_lru(self.cache_dir, ".avi", self.budget_bytes, self._remove)
+        return proxy_path
+
+    def get_or_source(self, video_path: str, executable: str = 'ffmpeg') -> str:
+        """Return the proxy of a video, or the source itself if no proxy can be made."""
+        try:
+            return self.get(video_path, executable)
+        except (OSError, RuntimeError) as e:
+            print(f"Could not create a proxy, loading the source: {e}")
+            return video_path
+
+
+# Shared by every video loader node in the pack
+proxy_cache = ProxyCache()
@@ -1,12 +1,22 @@
 """Nodes for loading and preparing videos for extension."""
 
 import os
-import subprocess
+import bisect
 import torch
 from shutil import copyfile
 import folder_paths
 from comfy.utils import ProgressBar
 from comfy_api.latest import io
+from .ffmpeg_reader import (
+    SUPPORTS_AUDIO_PIPE, FFmpegFrameReader, InterruptProcessingException, extract_audio, silent_audio
+)
+from .tensor_utils import OUTPUT_DTYPES, resolve_dtype
+from .video_backends import decoder_registry
+from .video_cache import clip_cache, clip_key, frame_disk_cache, proxy_cache
+from .video_utils import (
+    FFMPEG_SCALE_FLAGS, RESAMPLE_FILTERS, FrameBuffer, cached_probe, ffprobe_video_info,
+    frames_from_array, resolve_frame_window, resolve_output_size, showinfo_pts_time
+)
 
 UPLOAD_FOLDER = folder_paths.get_input_directory()
 
@@ -25,155 +35,270 @@ class LoadVideoForExtending(io.ComfyNode):
             description="Load a video and extract frames for extending",
             inputs=[
                 io.Custom("VIDEO").Input("video"),  # Special upload type
+                io.Int.Input("target_width", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Decode width (0 = from height / source)"),
+                io.Int.Input("target_height", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Decode height (0 = from width / source)"),
+                io.Int.Input("max_side", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Downscale so the longer side fits (0 = no limit)"),
+                io.Combo.Input("resample", options=RESAMPLE_FILTERS, default="area", optional=True),
+                io.Boolean.Input("disk_cache", default=False, optional=True,
+                                 tooltip="Keep decoded frames in a memory-mapped on-disk cache for reuse"),
+                io.Combo.Input("output_dtype", options=list(OUTPUT_DTYPES), default="float32", optional=True,
+                               tooltip="Precision of the frames output; float16/bfloat16 halve memory"),
+                io.Float.Input("cut_point", default=0.0, min=0.0, max=100000.0, step=0.1, optional=True,
+                               tooltip="Start of the decoded window (used when window_frames > 0)"),
+                io.Combo.Input("cut_point_type", options=["seconds", "frames"], default="seconds", optional=True),
+                io.Int.Input("window_frames", default=0, min=0, max=100000, step=1, optional=True,
+                             tooltip="Decode only this many target_fps frames from the cut point (0 = whole video)"),
+                io.Float.Input("target_fps", default=24.0, min=1.0, max=240.0, step=0.001, optional=True,
+                               tooltip="Frame rate the video is resampled to"),
+                io.Boolean.Input("load_audio", default=False, optional=True,
+                                 tooltip="Also output the audio of the decoded window (silence if the video has none)"),
+                io.Boolean.Input("proxy", default=False, optional=True,
+                                 tooltip="Decode a cached 480p MJPEG proxy of the video for previews "
+                                         "(KLINTER_PROXY=0/1 overrides this for every node)"),
             ],
             outputs=[
                 io.Image.Output(display_name="frames"),
-                io.Custom("TUPLE").Output(display_name="video_info")
+                io.Custom("TUPLE").Output(display_name="video_info"),
+                io.Custom("TIMESTAMPS").Output(display_name="timestamps"),
+                io.Audio.Output(display_name="audio")
             ]
         )
 
     @classmethod
     def _get_video_info(cls, video_path: str) -> dict:
-        """Get video information using ffprobe.
+        """Get video information with a single, cached ffprobe call.
         
         Args:
             video_path: Path to the video file
             
         Returns:
-            Dictionary containing video metadata (fps, width, height, duration)
+            Dictionary containing video metadata (fps, width, height, duration, frame_count)
         """
-        # First, get frame rate
-        fps_cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=r_frame_rate',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        
-        fps_result = subprocess.run(fps_cmd, capture_output=True, text=True)
-        if fps_result.returncode != 0:
-            raise RuntimeError(f"FFprobe error (fps): {fps_result.stderr}")
-            
-        fps_str = fps_result.stdout.strip()
-        if '/' in fps_str:
-            fps_num, fps_den = map(int, fps_str.split('/'))
-            fps = fps_num / fps_den
-        else:
-            fps = float(fps_str)
-
-        # Then get other stream information
-        info_cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=width,height',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        
-        info_result = subprocess.run(info_cmd, capture_output=True, text=True)
-        if info_result.returncode != 0:
-            raise RuntimeError(f"FFprobe error (info): {info_result.stderr}")
-            
-        width, height = map(int, info_result.stdout.strip().split('\n'))
-        
-        # Finally get duration
-        duration_cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        
-        duration_result = subprocess.run(duration_cmd, capture_output=True, text=True)
-        if duration_result.returncode != 0:
-            raise RuntimeError(f"FFprobe error (duration): {duration_result.stderr}")
-            
-        duration = float(duration_result.stdout.strip())
-
-        return {
-            'fps': fps,
-            'width': width,
-            'height': height,
-            'duration': duration
-        }
+        ffprobe = decoder_registry.ffprobe or 'ffprobe'
+        return cached_probe(video_path, lambda path: ffprobe_video_info(path, ffprobe), "ffprobe")
 
     @classmethod
-    def IS_CHANGED(cls, video):
+    def IS_CHANGED(cls, video, **kwargs):
         """Tell ComfyUI that the output depends on the video file."""
         image_path = folder_paths.get_annotated_filepath(video)
         if image_path is None:
             return False
-        return os.path.getmtime(image_path)
+        # The KLINTER_PROXY override can switch proxies without any input changing
+        return f"{os.path.getmtime(image_path)}_{proxy_cache.enabled(kwargs.get('proxy', False))}"
 
     @classmethod
-    def VALIDATE_INPUTS(cls, video):
+    def VALIDATE_INPUTS(cls, video, **kwargs):
         """Validate that the video file exists."""
         if not folder_paths.exists_annotated_filepath(video):
             return "Video file not found: {}".format(video)
         return True
 
     @classmethod
-    def execute(cls, video: str) -> io.NodeOutput:
+    def execute(cls, video: str, target_width: int = 0, target_height: int = 0,
+                max_side: int = 0, resample: str = "area", disk_cache: bool = False,
+                output_dtype: str = "float32", cut_point: float = 0.0, cut_point_type: str = "seconds",
+                window_frames: int = 0, target_fps: float = 24.0, load_audio: bool = False,
+                proxy: bool = False) -> io.NodeOutput:
         """Load video and convert to tensor of frames.
         
         Args:
             video: Name or path of the video file
+            target_width: Decode width (0 = keep aspect / source)
+            target_height: Decode height (0 = keep aspect / source)
+            max_side: Downscale so the longer side fits (0 = no limit)
+            resample: Resampling filter for decode-time downscaling
+            disk_cache: Serve frames from the memory-mapped on-disk clip cache
+            output_dtype: Precision of the frames output
+            cut_point: Start of the decoded window, in cut_point_type units
+            cut_point_type: Whether cut_point is in seconds or target_fps frames
+            window_frames: Number of target_fps frames to decode from the cut point (0 = whole video)
+            target_fps: Frame rate the video is resampled to
+            load_audio: Also return the audio of the decoded window
+            proxy: Decode the low-resolution proxy instead of the source
             
         Returns:
-            Tuple of (frames tensor, video info tuple)
+            Tuple of (frames tensor, video info tuple, per-frame timestamps in
+            seconds, AUDIO dict or None)
         """
         video_path = folder_paths.get_annotated_filepath(video)
         if video_path is None:
             raise ValueError("Video file not found")
 
+        if proxy_cache.enabled(proxy):
+            # Everything below, including the cache keys, then refers to the proxy
+            video_path = proxy_cache.get_or_source(video_path, decoder_registry.ffmpeg or 'ffmpeg')
+
         # Get video info
-        info = self._get_video_info(video_path)
+        info = cls._get_video_info(video_path)
 
-        # Check if video duration is at least 5 seconds
-        if info['duration'] < 5.0:
-            raise ValueError("Video must be at least 5 seconds long")
+        start_time = 0.0
+        if window_frames > 0:
+            # The window is the only length requirement; a whole-video load takes any clip
+            start_time = cut_point if cut_point_type == "seconds" else cut_point / target_fps
+            if start_time + window_frames / target_fps > info['duration'] + 1e-6:
+                raise ValueError(f"Cut point must leave at least {window_frames / target_fps:.2f} seconds of video")
 
-        # Convert video to 24fps and read frames
-        ffmpeg_cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            '-vf', 'fps=fps=24',  # Force 24fps
-            '-f', 'image2pipe',
-            '-pix_fmt', 'rgb24',
-            '-vcodec', 'rawvideo',
-            '-'
-        ]
+        size = resolve_output_size(info['width'], info['height'], target_width, target_height, max_side)
+        width, height = size if size is not None else (info['width'], info['height'])
+        dtype = resolve_dtype(output_dtype)
 
-        process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        frames = []
+        def decode():
+            if disk_cache:
+                cached = cls._load_from_disk_cache(video_path, info, size, resample, dtype,
+                                                   start_time, window_frames, target_fps)
+                if cached is not None:
+                    audio = cls._load_audio(video_path, info, start_time, window_frames / target_fps) \
+                        if load_audio else None
+                    return cached[0], audio, cached[1]
+            return cls._load_frames(video_path, info, size, resample, dtype=dtype, start_time=start_time,
+                                    max_frames=window_frames, fps=target_fps, audio=load_audio)
 
-        frame_size = info['width'] * info['height'] * 3
+        # Decoded clips are shared across runs through the clip cache
+        key = clip_key(video_path, fps=target_fps, size=size, resample=resample, dtype=output_dtype,
+                       start_time=start_time, window_frames=window_frames, audio=load_audio)
+        frames, audio, timestamps = clip_cache.get_or_load(key, decode)
+        if load_audio and audio is None:
+            audio = silent_audio(frames.shape[0] / target_fps)
 
-        while True:
-            raw_frame = process.stdout.read(frame_size)
-            if len(raw_frame) != frame_size:
-                break
+        video_info = (info['fps'], width, height, info['duration'])
+        return io.NodeOutput(frames, video_info, timestamps, audio)
 
-            frame = torch.frombuffer(raw_frame, dtype=torch.uint8)
-            frame = frame.reshape(info['height'], info['width'], 3)
-            frame = frame.float() / 255.0
-            frames.append(frame)
+    @classmethod
+    def _load_from_disk_cache(cls, video_path: str, info: dict, size=None, resample: str = "area",
+                              dtype: torch.dtype = torch.float32, start_time: float = 0.0,
+                              max_frames: int = 0, fps: float = 24.0):
+        """Convert the resampled clip from the memory-mapped disk cache, filling it on a miss.
+        
+        The whole clip is cached once, with the presentation time of every
+        frame in its header; any window is then a slice of the mapping.
+        
+        Returns:
+            Tuple of (frames tensor, per-frame timestamps in seconds), or None
+            if the clip could not be cached
+        """
+        cached = frame_disk_cache.open(video_path, loader="LoadVideoForExtending", fps=fps)
+        if cached is None or 'timestamps' not in cached[1]:
+            # Entries without timestamps predate them; decode again
+            writer = frame_disk_cache.writer(video_path, {'fps': fps}, loader="LoadVideoForExtending", fps=fps)
+            try:
+                _, _, timestamps = cls._load_frames(video_path, info, sink=writer, fps=fps)
+            except InterruptProcessingException:
+                writer.abort()
+                raise
+            except Exception as e:
+                writer.abort()
+                print(f"Could not cache video frames: {e}")
+                return None
+            writer.meta['timestamps'] = timestamps
+            writer.commit()
+            cached = frame_disk_cache.open(video_path, loader="LoadVideoForExtending", fps=fps)
+            if cached is None:
+                return None
 
-        process.stdout.close()
-        process.wait()
+        data, meta = cached
+        window = resolve_frame_window(fps, start_time, 0, "seconds", 1, max_frames, len(data))
+        frames = frames_from_array(data, window, size, resample, dtype)
+        return frames, meta['timestamps'][window['start']:window['start'] + frames.shape[0]]
 
-        if process.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {process.stderr.read().decode()}")
+    @classmethod
+    def _load_frames(cls, video_path: str, info: dict, size=None, resample: str = "area", sink=None,
+                     dtype: torch.dtype = torch.float32, start_time: float = 0.0, max_frames: int = 0,
+                     fps: float = 24.0, audio: bool = False):
+        """Decode the video at a fixed frame rate into a frames tensor.
+        
+        Args:
+            video_path: Path to the video file
+            info: Probed video metadata
+            size: Optional (width, height) to scale to inside ffmpeg
+            resample: Resampling filter used when scaling
+            sink: Optional frame sink (e.g. a disk cache writer) to write into
+                instead of a new frames tensor
+            dtype: Floating point dtype of the frames tensor
+            start_time: Seek here before decoding; earlier frames are never decoded
+            max_frames: Stop after this many output frames (0 = until the end)
+            fps: Output frame rate; the fps filter is skipped if the source is
+                already at a constant rate of fps
+            audio: Also decode the audio of the same window
+            
+        Returns:
+            Tuple of (tensor of frames with shape (N, H, W, 3) or the sink if one
+            was given, AUDIO dict or None, presentation time of each frame in
+            the source in seconds)
+        """
+        # Resample to the target rate unless the source is already there. A
+        # variable frame rate stream reports its finest rate as r_frame_rate,
+        # so it only counts as matching if the average rate agrees too
+        filters = []
+        constant_rate = abs(info['fps'] - info.get('avg_fps', 0.0)) <= 1e-3
+        if not constant_rate or abs(info['fps'] - fps) > 1e-3:
+            filters.append(f'fps=fps={fps}')
+        if size is not None:
+            # Scale inside ffmpeg so the pipe carries output-sized frames
+            filters.append(f"scale={size[0]}:{size[1]}:flags={FFMPEG_SCALE_FLAGS[resample]}")
+        # showinfo logs the timestamp of each frame as it leaves the filter chain
+        filters.append('showinfo')
+        width, height = size if size is not None else (info['width'], info['height'])
+
+        args = []
+        if start_time > 0:
+            # Input seeking: only the window is decoded
+            args += ['-ss', f"{start_time:.6f}"]
+        args += ['-i', video_path, '-an', '-vf', ','.join(filters)]
+        if max_frames > 0:
+            args += ['-frames:v', str(max_frames)]
+
+        buffer = sink if sink is not None else FrameBuffer(
+            max_frames or int((info['duration'] - start_time) * fps) + 1, dtype
+        )
+
+        # A known audio track is demuxed as a second output of the same call;
+        # the fps filter only re-times video, so the window length carries over
+        duration = max_frames / fps if max_frames > 0 else 0.0
+        audio_args = None
+        if audio and info.get('has_audio') and SUPPORTS_AUDIO_PIPE:
+            audio_args = ['-t', f"{duration:.6f}"] if duration else []
+
+        pts_times = []
+
+        def on_stderr(line):
+            pts_time = showinfo_pts_time(line)
+            if pts_time is not None:
+                pts_times.append(pts_time)
 
-        if len(frames) == 0:
+        # The reader drains stderr and honours ComfyUI interrupts while streaming
+        reader = FFmpegFrameReader(args, width, height, executable=decoder_registry.ffmpeg or 'ffmpeg',
+                                   loglevel='info', on_stderr=on_stderr, audio_args=audio_args)
+        for frame in reader:
+            buffer.append(frame)
+
+        if len(buffer) == 0:
             raise ValueError("No frames could be extracted from the video")
 
-        video_info = (info['fps'], info['width'], info['height'], info['duration'])
-        return io.NodeOutput(torch.stack(frames), video_info)
+        # Input seeking restarts timestamps at the seek point
+        timestamps = [start_time + t for t in pts_times[:len(buffer)]]
+        if len(timestamps) < len(buffer):
+            raise RuntimeError(f"FFmpeg reported {len(timestamps)} timestamps for {len(buffer)} frames")
+
+        track = None
+        if audio_args is not None:
+            track = reader.audio
+        elif audio:
+            track = cls._load_audio(video_path, info, start_time, duration)
+        return (buffer if sink is not None else buffer.tensor()), track, timestamps
+
+    @classmethod
+    def _load_audio(cls, video_path: str, info: dict, start_time: float = 0.0, duration: float = 0.0):
+        """Demux just the audio of a window, skipping files the probe found silent.
+        
+        Returns:
+            AUDIO dict, or None if the video has no audio track
+        """
+        if info.get('has_audio') is False:
+            return None
+        return extract_audio(video_path, start_time, duration, decoder_registry.ffmpeg or 'ffmpeg')
 
 
 class PrepVideoForExtend(io.ComfyNode):
@@ -193,6 +318,13 @@ class PrepVideoForExtend(io.ComfyNode):
                 io.Image.Input("frames"),
                 io.Float.Input("cut_point", default=0.0, min=0.0, max=1000.0, step=0.1),
                 io.Combo.Input("cut_point_type", options=["seconds", "frames"], default="seconds"),
+                io.Float.Input("fps", default=24.0, min=1.0, max=240.0, step=0.001, optional=True,
+                               tooltip="Frame rate of the incoming frames"),
+                io.Int.Input("window_frames", default=120, min=1, max=100000, step=1, optional=True,
+                             tooltip="Number of frames to keep from the cut point"),
+                io.Custom("TIMESTAMPS").Input("timestamps", optional=True,
+                                              tooltip="Per-frame timestamps from the loader; "
+                                                      "a seconds cut point is matched against them"),
             ],
             outputs=[
                 io.Image.Output(display_name="processed_frames")
@@ -200,13 +332,17 @@ class PrepVideoForExtend(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, frames: torch.Tensor, cut_point: float, cut_point_type: str) -> io.NodeOutput:
+    def execute(cls, frames: torch.Tensor, cut_point: float, cut_point_type: str, fps: float = 24.0,
+                window_frames: int = 120, timestamps=None) -> io.NodeOutput:
         """Process video frames for extension.
         
         Args:
             frames: Tensor of video frames
             cut_point: Point at which to cut the video
             cut_point_type: Whether cut_point is in seconds or frames
+            fps: Frame rate of the incoming frames
+            window_frames: Number of frames to keep from the cut point
+            timestamps: Optional per-frame timestamps (seconds) from the loader
             
         Returns:
             Tensor of processed frames
@@ -215,16 +351,21 @@ class PrepVideoForExtend(io.ComfyNode):
 
         # Calculate frame positions
         if cut_point_type == "seconds":
-            start_frame = int(cut_point * 24)  # Assuming 24fps from the import node
+            if timestamps:
+                # First frame presented at or after the cut point
+                start_frame = bisect.bisect_left(timestamps, cut_point - 1e-6)
+            else:
+                start_frame = int(cut_point * fps)
         else:
             start_frame = int(cut_point)
 
-        frames_needed = 120  # 5 seconds at 24fps
+        frames_needed = window_frames
+        seconds_needed = frames_needed / fps
 
-        if start_frame + frames_needed > num_frames:
-            raise ValueError("Cut point must leave at least 5 seconds of video")
         if num_frames < frames_needed:
-            raise ValueError("Video must be at least 5 seconds long")
+            raise ValueError(f"Video must be at least {seconds_needed:.2f} seconds long")
+        if start_frame + frames_needed > num_frames:
+            raise ValueError(f"Cut point must leave at least {seconds_needed:.2f} seconds of video")
 
         selected_frames = frames[start_frame:start_frame + frames_needed]
         return io.NodeOutput(selected_frames)
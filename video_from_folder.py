@@ -4,8 +4,20 @@ import os
 import torch
 import numpy as np
 import random
+from concurrent.futures import ThreadPoolExecutor
 import folder_paths
 from comfy_api.latest import io
+from .ffmpeg_reader import FFmpegFrameReader, InterruptProcessingException, extract_audio, silent_audio
+from .manifest_index import ManifestIndex, is_manifest
+from .tensor_utils import OUTPUT_DTYPES, resolve_dtype
+from .video_backends import decoder_registry
+from .video_cache import clip_cache, clip_key, frame_disk_cache, proxy_cache
+from .video_index import VideoFolderIndex
+from .video_utils import (
+    FFMPEG_SCALE_FLAGS, RESAMPLE_FILTERS, FrameBuffer, Prefetcher, SceneCutDetector, TensorSlotSink, cached_probe,
+    estimate_frame_count, ffprobe_video_info, frames_from_array, resize_frame,
+    resolve_frame_window, resolve_output_size, showinfo_pts_time, split_segments
+)
 
 # Try to import video reading libraries
 try:
@@ -20,14 +32,20 @@ try:
 except ImportError:
     HAS_IMAGEIO = False
 
-try:
-    import subprocess
-    import json
-    HAS_FFMPEG = True
-except ImportError:
-    HAS_FFMPEG = False
+SAMPLING_MODES = ["window", "keyframes", "uniform"]
+
+# In uniform sampling, targets this close ahead are reached with grab() instead of a seek
+SEEK_GRAB_LIMIT = 32
+
+SELECTION_MODES = ["file", "shot"]
+
+# Longer side of the thumbnails compared by scene-cut detection
+SCENE_ANALYSIS_SIDE = 64
 
 class VideoFromFolder(io.ComfyNode):
+    _prefetcher = Prefetcher()
+    _audio_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="klinter-audio")
+
     @classmethod
     def define_schema(cls) -> io.Schema:
         """Define the schema for the video from folder node.
@@ -45,6 +63,47 @@ class VideoFromFolder(io.ComfyNode):
                 io.Int.Input("seed", default=0, min=0, max=0xffffffffffffffff),
                 io.Combo.Input("seed_mode", options=["increment", "random", "fixed"]),
                 io.Int.Input("seed_offset", default=0, min=0, step=1, optional=True),
+                io.Combo.Input("window_unit", options=["frames", "seconds"], default="frames", optional=True),
+                io.Float.Input("start", default=0.0, min=0.0, step=0.1, optional=True,
+                               tooltip="Window start in window_unit"),
+                io.Float.Input("end", default=0.0, min=0.0, step=0.1, optional=True,
+                               tooltip="Window end in window_unit (0 = end of video)"),
+                io.Int.Input("frame_stride", default=1, min=1, step=1, optional=True,
+                             tooltip="Keep every Nth frame of the window"),
+                io.Int.Input("max_frames", default=0, min=0, step=1, optional=True,
+                             tooltip="Maximum number of frames to load (0 = no limit)"),
+                io.Int.Input("target_width", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Decode width (0 = from height / source)"),
+                io.Int.Input("target_height", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Decode height (0 = from width / source)"),
+                io.Int.Input("max_side", default=0, min=0, max=16384, step=8, optional=True,
+                             tooltip="Downscale so the longer side fits (0 = no limit)"),
+                io.Combo.Input("resample", options=RESAMPLE_FILTERS, default="area", optional=True),
+                io.Boolean.Input("disk_cache", default=False, optional=True,
+                                 tooltip="Keep decoded frames in a memory-mapped on-disk cache for reuse"),
+                io.Int.Input("parallel_segments", default=1, min=1, max=64, step=1, optional=True,
+                             tooltip="Decode the clip as N segments on parallel threads (1 = serial)"),
+                io.Combo.Input("output_dtype", options=list(OUTPUT_DTYPES), default="float32", optional=True,
+                               tooltip="Precision of the frames output; float16/bfloat16 halve memory"),
+                io.Boolean.Input("prefetch", default=False, optional=True,
+                                 tooltip="In increment mode, decode the next video in the background"),
+                io.Combo.Input("sampling", options=SAMPLING_MODES, default="window", optional=True,
+                               tooltip="window: every frame_stride-th frame; keyframes: only the key frames "
+                                       "of the window; uniform: num_samples evenly spaced frames"),
+                io.Int.Input("num_samples", default=8, min=1, max=4096, step=1, optional=True,
+                             tooltip="Number of frames taken in uniform sampling"),
+                io.Boolean.Input("load_audio", default=False, optional=True,
+                                 tooltip="Also output the audio of the window (silence if the video has none)"),
+                io.Combo.Input("selection", options=SELECTION_MODES, default="file", optional=True,
+                               tooltip="file: the seed picks a video; shot: the seed picks one shot across "
+                                       "all videos and only that shot is decoded (start/end are ignored)"),
+                io.Float.Input("scene_threshold", default=0.15, min=0.01, max=1.0, step=0.01, optional=True,
+                               tooltip="Frame difference that counts as a cut when indexing shots"),
+                io.Float.Input("min_shot_seconds", default=1.0, min=0.0, step=0.1, optional=True,
+                               tooltip="Shorter shots are never selected"),
+                io.Boolean.Input("proxy", default=False, optional=True,
+                                 tooltip="Decode a cached 480p MJPEG proxy of the video for previews "
+                                         "(KLINTER_PROXY=0/1 overrides this for every node)"),
             ],
             outputs=[
                 io.Image.Output(display_name="frames"),
@@ -52,30 +111,55 @@ class VideoFromFolder(io.ComfyNode):
                 io.Int.Output(display_name="video_index"),
                 io.Float.Output(display_name="fps"),
                 io.Float.Output(display_name="duration"),
-                io.Int.Output(display_name="frame_count")
+                io.Int.Output(display_name="frame_count"),
+                io.Custom("FRAME_INDICES").Output(display_name="source_indices"),
+                io.Custom("TIMESTAMPS").Output(display_name="timestamps"),
+                io.Audio.Output(display_name="audio")
             ]
         )
 
     @classmethod
-    def fingerprint_inputs(cls, folder_path, seed, seed_mode, seed_offset=0):
+    def fingerprint_inputs(cls, folder_path, seed, seed_mode, seed_offset=0, selection="file", **kwargs):
         """Tell ComfyUI when the node output changes (renamed from IS_CHANGED)."""
         # For increment mode, always mark as changed so it increments each run
         if seed_mode == "increment":
             return float("NaN")
-        # For random mode with same seed, return same video
-        return f"{folder_path}_{seed}_{seed_mode}_{seed_offset}"
+        # For random mode with same seed, return same video unless the folder
+        # listing or the selected file changed on disk
+        try:
+            index = cls.get_source_index(folder_path)
+            if selection == "shot":
+                # The shot list spans every file
+                signature = index.signature()
+            else:
+                video_files = index.files()
+                video_index = cls.calculate_video_index(seed, seed_mode, seed_offset, len(video_files))
+                signature = index.signature(video_files[video_index])
+        except (OSError, ValueError, ZeroDivisionError):
+            signature = ""
+        # The KLINTER_PROXY override can switch proxies without any input changing
+        proxy = proxy_cache.enabled(kwargs.get('proxy', False))
+        return f"{folder_path}_{seed}_{seed_mode}_{seed_offset}_{selection}_{proxy}_{signature}"
+
+    @classmethod
+    def get_source_index(cls, folder_path):
+        """Return the index listing the videos: the folder's, or the manifest's if folder_path is one."""
+        if is_manifest(folder_path):
+            return ManifestIndex.for_path(folder_path)
+        return VideoFolderIndex.for_folder(folder_path)
 
     @classmethod
     def get_video_files(cls, folder_path):
-        """Get sorted list of video files in the folder."""
-        if not os.path.isdir(folder_path):
+        """Get sorted list of video files in the folder from its persistent index.
+        
+        For a manifest this is a lazy sequence of absolute paths; indexing it
+        reads only the requested record, and os.path.join(folder_path, item)
+        still yields the file's path.
+        """
+        if not os.path.isdir(folder_path) and not is_manifest(folder_path):
             raise FileNotFoundError(f"Folder '{folder_path}' cannot be found.")
         
-        valid_extensions = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v'}
-        video_files = sorted([
-            f for f in os.listdir(folder_path)
-            if os.path.splitext(f.lower())[1] in valid_extensions
-        ])
+        video_files = cls.get_source_index(folder_path).files()
         
         if not video_files:
             raise ValueError(f"No video files found in folder: {folder_path}")
@@ -83,8 +167,98 @@ class VideoFromFolder(io.ComfyNode):
         return video_files
 
     @classmethod
-    def get_video_info(cls, video_path):
-        """Get video information using available methods."""
+    def _detect_scenes(cls, video_path, threshold=0.15):
+        """Split a video into shots with a thumbnail-sized frame-difference pass.
+        
+        Returns:
+            list: [start, end) frame ranges, or None if no back end could decode it
+        """
+        # Runs for many files at once from get_shots, which saves the index afterwards
+        info = cls.get_video_info(video_path, save=False)
+        window = resolve_frame_window(info['fps'], total_frames=info.get('frame_count', 0))
+        size = resolve_output_size(info['width'], info['height'], max_side=SCENE_ANALYSIS_SIDE)
+        print(f"Detecting shots in {os.path.basename(video_path)}")
+        # Scene detection only decodes thumbnails; leave benchmarking to real loads
+        for name, decode in cls._backends(video_path, info, benchmark=False):
+            # Cuts closer than a quarter second are flashes, not new shots
+            detector = SceneCutDetector(threshold, min_gap=int(info['fps'] / 4))
+            try:
+                if decode(video_path, info, window, size, "area", sink=detector) is None or not len(detector):
+                    continue
+            except InterruptProcessingException:
+                raise
+            except Exception as e:
+                print(f"{name} failed to detect shots: {e}")
+                continue
+            return detector.shots()
+        return None
+
+    @classmethod
+    def get_shots(cls, folder_path, video_files, threshold=0.15, min_shot_seconds=1.0):
+        """List every shot in the folder as (file index, file name, start frame, end frame).
+        
+        Scene detection runs once per file, in parallel, and is kept in the
+        index of the folder holding the file; later calls only read the index.
+        Each index is written once, after every file has been probed.
+        """
+        indexes = set()
+        
+        def scenes(name):
+            # Manifest entries can live in any folder
+            folder, base = os.path.split(os.path.abspath(os.path.join(folder_path, name)))
+            index = VideoFolderIndex.for_folder(folder)
+            indexes.add(index)
+            return index.get_scenes(base, lambda path: cls._detect_scenes(path, threshold), threshold, save=False)
+        
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="klinter-scenes") as pool:
+            file_shots = list(pool.map(scenes, video_files))
+        
+        shots = []
+        for file_index, (name, found) in enumerate(zip(video_files, file_shots)):
+            if not found:
+                continue
+            min_frames = min_shot_seconds * cls.get_video_info(os.path.join(folder_path, name), save=False)['fps']
+            shots.extend((file_index, name, start, end) for start, end in found if end - start >= min_frames)
+        for index in indexes:
+            index.save()
+        
+        if not shots:
+            raise ValueError(f"No shots of at least {min_shot_seconds} seconds found in folder: {folder_path}")
+        return shots
+
+    @classmethod
+    def get_video_info(cls, video_path, save=True):
+        """Get video information, reusing the folder index when the file is unchanged.
+        
+        Pass save=False when probing many files and save the folder index once afterwards.
+        """
+        if proxy_cache.contains(video_path):
+            # Proxies come and go with eviction; a folder index would only collect stale entries
+            info = cached_probe(video_path, cls._probe_video_info, "VideoFromFolder")
+        else:
+            folder, name = os.path.split(os.path.abspath(video_path))
+            index = VideoFolderIndex.for_folder(folder)
+            info = cached_probe(video_path, lambda path: index.get_info(name, cls._probe_video_info, save),
+                                "VideoFromFolder")
+        if info is not None:
+            return info
+        
+        # Return defaults if all methods fail
+        print(f"Warning: Could not get video info for {video_path}, using defaults")
+        return {
+            'fps': 24.0,
+            'width': 1920,
+            'height': 1080,
+            'duration': 0
+        }
+
+    @classmethod
+    def _probe_video_info(cls, video_path):
+        """Probe video information using available methods.
+        
+        Returns:
+            dict: Video info, or None if every method failed
+        """
         # Try cv2 first
         if HAS_CV2:
             try:
@@ -116,174 +290,526 @@ class VideoFromFolder(io.ComfyNode):
                 width = meta.get('size', [1920, 1080])[0]
                 height = meta.get('size', [1920, 1080])[1]
                 duration = meta.get('duration', 0)
+                nframes = meta.get('nframes', 0)
                 reader.close()
                 
                 return {
                     'fps': fps,
                     'width': width,
                     'height': height,
-                    'duration': duration
+                    'duration': duration,
+                    # nframes is inf for streams without a reliable count
+                    'frame_count': int(nframes) if nframes and nframes != float('inf') else 0
                 }
             except Exception as e:
                 print(f"imageio failed to get video info: {e}")
         
         # Try ffprobe if available
-        if HAS_FFMPEG:
+        if decoder_registry.available('ffprobe'):
             try:
-                cmd = [
-                    'ffprobe',
-                    '-v', 'quiet',
-                    '-print_format', 'json',
-                    '-show_format',
-                    '-show_streams',
-                    video_path
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                data = json.loads(result.stdout)
-                
-                video_stream = None
-                for stream in data.get('streams', []):
-                    if stream.get('codec_type') == 'video':
-                        video_stream = stream
-                        break
-                
-                if video_stream:
-                    fps_str = video_stream.get('r_frame_rate', '24/1')
-                    if '/' in fps_str:
-                        num, den = map(int, fps_str.split('/'))
-                        fps = num / den if den != 0 else 24.0
-                    else:
-                        fps = float(fps_str)
-                    
-                    return {
-                        'fps': fps,
-                        'width': int(video_stream.get('width', 1920)),
-                        'height': int(video_stream.get('height', 1080)),
-                        'duration': float(data.get('format', {}).get('duration', 0))
-                    }
+                return ffprobe_video_info(video_path, decoder_registry.ffprobe)
             except Exception as e:
                 print(f"ffprobe failed: {e}")
         
-        # Return defaults if all methods fail
-        print(f"Warning: Could not get video info for {video_path}, using defaults")
-        return {
-            'fps': 24.0,
-            'width': 1920,
-            'height': 1080,
-            'duration': 0
-        }
+        return None
 
     @classmethod
-    def load_video_frames(cls, video_path):
-        """Load video and convert to tensor of frames using available methods.
+    def _decode_cv2(cls, video_path, info, window, size=None, resample="area", sink=None):
+        """Decode the frame window with cv2 straight into a preallocated buffer."""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+        buffer = sink if sink is not None else FrameBuffer(window['count'] or estimate_frame_count(info))
+        start, end, stride = window['start'], window['end'], window['stride']
+        max_frames = window['max_frames']
+        try:
+            if start > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            index = start
+            while (not end or index < end) and (not max_frames or len(buffer) < max_frames):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if size is not None:
+                    # Downscale on uint8 so float conversion scales with the output
+                    frame = resize_frame(frame, size, resample)
+                # Convert BGR to RGB in place before the float conversion
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+                buffer.append(frame)
+                # grab() advances past strided frames without retrieving them
+                for _ in range(stride - 1):
+                    index += 1
+                    if (end and index >= end) or not cap.grab():
+                        break
+                index += 1
+        finally:
+            cap.release()
+        return buffer
+
+    @classmethod
+    def _decode_imageio(cls, video_path, info, window, size=None, resample="area", sink=None):
+        """Decode the frame window with imageio straight into a preallocated buffer."""
+        reader = imageio.get_reader(video_path)
+        buffer = sink if sink is not None else FrameBuffer(window['count'] or estimate_frame_count(info))
+        start, end, stride = window['start'], window['end'], window['stride']
+        max_frames = window['max_frames']
+        try:
+            for index, frame in enumerate(reader):
+                if end and index >= end:
+                    break
+                # Frames outside the window are skipped before any conversion
+                if index < start or (index - start) % stride:
+                    continue
+                if size is not None:
+                    frame = resize_frame(frame, size, resample)
+                buffer.append(frame)
+                if max_frames and len(buffer) >= max_frames:
+                    break
+        finally:
+            reader.close()
+        return buffer
+
+    @classmethod
+    def _decode_ffmpeg(cls, video_path, info, window, size=None, resample="area", sink=None):
+        """Decode the frame window from an ffmpeg rawvideo pipe into a preallocated buffer."""
+        args = []
+        if window['start'] > 0:
+            # Input seeking: frames before the window are never decoded
+            args += ['-ss', f"{window['start'] / info['fps']:.6f}"]
+        args += ['-i', video_path, '-an']
+        filters = []
+        if window['stride'] > 1:
+            filters.append(f"select='not(mod(n\\,{window['stride']}))'")
+        if size is not None:
+            filters.append(f"scale={size[0]}:{size[1]}:flags={FFMPEG_SCALE_FLAGS[resample]}")
+        if filters:
+            args += ['-vf', ','.join(filters)]
+        if window['stride'] > 1:
+            args += ['-vsync', '0']
+        if window['count']:
+            args += ['-frames:v', str(window['count'])]
+
+        width, height = size if size is not None else (info['width'], info['height'])
+        buffer = sink if sink is not None else FrameBuffer(window['count'] or estimate_frame_count(info))
+
+        for frame in FFmpegFrameReader(args, width, height, executable=decoder_registry.ffmpeg or 'ffmpeg'):
+            buffer.append(frame)
+        return buffer
+
+    @classmethod
+    def _sample_cv2(cls, video_path, info, indices, size=None, resample="area", sink=None):
+        """Decode only the given source frames with cv2, seeking between distant ones."""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+        buffer = sink if sink is not None else FrameBuffer(len(indices))
+        position = 0
+        try:
+            for index in indices:
+                if index < position or index - position > SEEK_GRAB_LIMIT:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                elif not all(cap.grab() for _ in range(index - position)):
+                    break
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                position = index + 1
+                if size is not None:
+                    frame = resize_frame(frame, size, resample)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+                buffer.append(frame)
+        finally:
+            cap.release()
+        return buffer
+
+    @classmethod
+    def _sample_ffmpeg(cls, video_path, info, indices, size=None, resample="area", sink=None):
+        """Decode only the given source frames with one seeking ffmpeg call per frame."""
+        width, height = size if size is not None else (info['width'], info['height'])
+        buffer = sink if sink is not None else FrameBuffer(len(indices))
+        for index in indices:
+            # Half a frame early so rounding cannot land the seek on the next frame
+            args = ['-ss', f"{max(index - 0.5, 0) / info['fps']:.6f}", '-i', video_path, '-an']
+            if size is not None:
+                args += ['-vf', f"scale={size[0]}:{size[1]}:flags={FFMPEG_SCALE_FLAGS[resample]}"]
+            args += ['-frames:v', '1']
+            decoded = len(buffer)
+            for frame in FFmpegFrameReader(args, width, height, executable=decoder_registry.ffmpeg or 'ffmpeg'):
+                buffer.append(frame)
+            if len(buffer) == decoded:
+                break
+        return buffer
+
+    @classmethod
+    def _load_uniform(cls, video_path, info, window, num_samples, size, resample, dtype):
+        """Decode num_samples evenly spaced frames of the window, first and last included.
         
         Returns:
-            Tuple of (frames tensor, fps, duration, frame_count)
+            Tuple of (frames tensor, source frame indices)
         """
-        frames = []
-        info = cls.get_video_info(video_path)
+        first = window['start']
+        last = (window['end'] or estimate_frame_count(info)) - 1
+        if last < first:
+            last = first
+        count = min(num_samples, last - first + 1)
+        indices = np.linspace(first, last, count).round().astype(int).tolist()
         
-        # Try cv2 first (most reliable and commonly available)
-        if HAS_CV2:
+        samplers = {"cv2": cls._sample_cv2, "ffmpeg": cls._sample_ffmpeg}
+        for name, _ in cls._backends(video_path, info):
+            if name not in samplers:
+                continue
             try:
-                cap = cv2.VideoCapture(video_path)
-                if cap.isOpened():
-                    while True:
-                        ret, frame = cap.read()
-                        if not ret:
-                            break
-                        # Convert BGR to RGB
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        frame_tensor = torch.from_numpy(frame_rgb.astype(np.float32) / 255.0)
-                        frames.append(frame_tensor)
-                    cap.release()
-                    
-                    if frames:
-                        frame_count = len(frames)
-                        duration = frame_count / info['fps'] if info['fps'] > 0 else 0
-                        return torch.stack(frames), info['fps'], duration, frame_count
-                    else:
-                        print("cv2: No frames extracted")
+                buffer = samplers[name](video_path, info, indices, size, resample,
+                                        sink=FrameBuffer(count, dtype))
+            except InterruptProcessingException:
+                raise
             except Exception as e:
-                print(f"cv2 failed to load video: {e}")
-                frames = []  # Reset frames if cv2 failed
+                print(f"{name} failed to sample video: {e}")
+                continue
+            if buffer is None or not len(buffer):
+                print(f"{name}: No frames extracted")
+                continue
+            # A short result means the probe overestimated the clip length
+            return buffer.tensor(), indices[:len(buffer)]
         
-        # Try imageio if cv2 failed or not available
-        if HAS_IMAGEIO and not frames:
-            try:
-                reader = imageio.get_reader(video_path)
-                for frame in reader:
-                    frame_tensor = torch.from_numpy(frame.astype(np.float32) / 255.0)
-                    frames.append(frame_tensor)
-                reader.close()
-                
-                if frames:
-                    frame_count = len(frames)
-                    duration = frame_count / info['fps'] if info['fps'] > 0 else 0
-                    return torch.stack(frames), info['fps'], duration, frame_count
-                else:
-                    print("imageio: No frames extracted")
-            except Exception as e:
-                print(f"imageio failed to load video: {e}")
-                frames = []  # Reset frames if imageio failed
+        cls._raise_no_backend()
+
+    @classmethod
+    def _load_keyframes(cls, video_path, info, window, size, resample, dtype):
+        """Decode only the key frames of the window.
         
-        # Try ffmpeg as last resort
-        if HAS_FFMPEG and not frames:
+        ffmpeg's -skip_frame nokey drops every other frame before it reaches
+        the decoder, and a showinfo filter in the same call reports each key
+        frame's timestamp.
+        
+        Returns:
+            Tuple of (frames tensor, source timestamps in seconds)
+        """
+        if not decoder_registry.available('ffmpeg'):
+            raise ValueError("Keyframe sampling requires ffmpeg (system package or imageio[ffmpeg])")
+        
+        start_time = window['start'] / info['fps']
+        args = ['-skip_frame', 'nokey']
+        if start_time > 0:
+            args += ['-ss', f"{start_time:.6f}"]
+        args += ['-i', video_path, '-an']
+        if window['end']:
+            args += ['-t', f"{(window['end'] - window['start']) / info['fps']:.6f}"]
+        filters = ['showinfo']
+        if size is not None:
+            filters.append(f"scale={size[0]}:{size[1]}:flags={FFMPEG_SCALE_FLAGS[resample]}")
+        args += ['-vf', ','.join(filters), '-vsync', '0']
+        if window['max_frames']:
+            args += ['-frames:v', str(window['max_frames'])]
+        
+        pts_times = []
+        
+        def on_stderr(line):
+            pts_time = showinfo_pts_time(line)
+            if pts_time is not None:
+                pts_times.append(pts_time)
+        
+        width, height = size if size is not None else (info['width'], info['height'])
+        buffer = FrameBuffer(window['max_frames'] or 16, dtype)
+        reader = FFmpegFrameReader(args, width, height, executable=decoder_registry.ffmpeg,
+                                   loglevel='info', on_stderr=on_stderr)
+        for frame in reader:
+            buffer.append(frame)
+        if not len(buffer):
+            raise ValueError(f"No key frames found in the requested window of {video_path}")
+        
+        # Input seeking restarts timestamps at the seek point
+        timestamps = [start_time + t for t in pts_times[:len(buffer)]]
+        return buffer.tensor(), timestamps
+
+    @classmethod
+    def load_video_frames(cls, video_path, start=0.0, end=0.0, window_unit="frames",
+                          frame_stride=1, max_frames=0, target_width=0, target_height=0,
+                          max_side=0, resample="area", disk_cache=False, parallel_segments=1,
+                          output_dtype="float32", sampling="window", num_samples=8, audio=False,
+                          proxy=False):
+        """Load video and convert to tensor of frames using available methods.
+        
+        Each back end writes frames into a single output buffer sized from the
+        probed frame count, so peak memory stays at about one copy of the clip.
+        Frames outside the requested window, or skipped by the stride, are
+        seeked or grabbed past and never converted to float.
+        
+        Args:
+            video_path: Path to the video file
+            start: Window start, in window_unit
+            end: Window end (exclusive) in window_unit, 0 for the end of the clip
+            window_unit: "frames" or "seconds"
+            frame_stride: Keep every frame_stride-th frame of the window
+            max_frames: Maximum number of frames to load, 0 for no limit
+            target_width: Decode width, 0 to keep aspect from target_height
+            target_height: Decode height, 0 to keep aspect from target_width
+            max_side: Cap on the longer output side, 0 for no cap
+            resample: Resampling filter used when downscaling
+            disk_cache: Serve frames from (and populate) the memory-mapped disk cache
+            parallel_segments: Split the window into this many segments decoded
+                on parallel threads (1 = serial)
+            output_dtype: "float32", "float16" or "bfloat16"
+            sampling: "window" for the strided window, "keyframes" for only its
+                key frames, "uniform" for num_samples evenly spaced frames
+            num_samples: Frames taken in uniform sampling
+            audio: Also return the audio of the window, demuxed on a background
+                thread while the frames decode
+            proxy: Decode the cached low-resolution proxy instead of the source
+                (the caller resolves the KLINTER_PROXY override)
+        
+        Returns:
+            Tuple of (frames tensor, fps, duration, frame_count, source frame
+            indices, source timestamps in seconds, AUDIO dict or None). Sampled
+            modes report the source fps and the duration the samples span.
+        """
+        if proxy:
+            video_path = proxy_cache.get_or_source(video_path, decoder_registry.ffmpeg or 'ffmpeg')
+        info = cls.get_video_info(video_path)
+        window = resolve_frame_window(info['fps'], start, end, window_unit, frame_stride,
+                                      max_frames, info.get('frame_count', 0))
+        size = resolve_output_size(info['width'], info['height'], target_width, target_height, max_side)
+        dtype = resolve_dtype(output_dtype)
+        
+        audio_future = None
+        if audio:
+            audio_future = cls._audio_pool.submit(cls._load_audio, video_path, info, window, sampling)
+        result = cls._load_frames(video_path, info, window, size, resample, dtype, disk_cache,
+                                  parallel_segments, sampling, num_samples)
+        if audio_future is None:
+            return (*result, None)
+        track = audio_future.result()
+        if track is None:
+            # Keep the output connectable for clips without sound
+            track = silent_audio(result[2])
+        return (*result, track)
+
+    @classmethod
+    def _load_audio(cls, video_path, info, window, sampling="window"):
+        """Demux only the audio of the frame window with an audio-only ffmpeg call.
+        
+        cv2 and imageio cannot read audio, so the track is decoded separately
+        (the video stream is never decoded) and covers the same source span as
+        the frames; a strided window keeps its real-time length.
+        
+        Returns:
+            AUDIO dict, or None if the video has no audio or ffmpeg is missing
+        """
+        if info.get('has_audio') is False or not decoder_registry.available('ffmpeg'):
+            return None
+        start_time = window['start'] / info['fps']
+        if sampling == "window" and window['count']:
+            duration = window['count'] * window['stride'] / info['fps']
+        elif window['end']:
+            duration = (window['end'] - window['start']) / info['fps']
+        else:
+            duration = 0.0
+        return extract_audio(video_path, start_time, duration, decoder_registry.ffmpeg)
+
+    @classmethod
+    def _load_frames(cls, video_path, info, window, size, resample, dtype, disk_cache=False,
+                     parallel_segments=1, sampling="window", num_samples=8):
+        """Decode the frames of a resolved window with the fastest working path.
+        
+        Returns:
+            Tuple of (frames tensor, fps, duration, frame_count, source frame
+            indices, source timestamps in seconds)
+        """
+        if sampling == "keyframes":
+            frames, timestamps = cls._load_keyframes(video_path, info, window, size, resample, dtype)
+            indices = [int(round(t * info['fps'])) for t in timestamps]
+            return cls._sampled_result(frames, info, indices, timestamps)
+        if sampling == "uniform":
+            frames, indices = cls._load_uniform(video_path, info, window, num_samples, size, resample, dtype)
+            timestamps = [index / info['fps'] for index in indices]
+            return cls._sampled_result(frames, info, indices, timestamps)
+        
+        if disk_cache:
+            frames = cls._load_from_disk_cache(video_path, info, window, size, resample, dtype)
+            if frames is not None:
+                return cls._window_result(frames, info, window)
+        
+        if parallel_segments > 1:
+            frames = cls._load_parallel(video_path, info, window, size, resample, parallel_segments, dtype)
+            if frames is not None:
+                return cls._window_result(frames, info, window)
+        
+        for name, decode in cls._backends(video_path, info):
             try:
-                # Check if ffmpeg is actually available in system
-                subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-                
-                cmd = [
-                    'ffmpeg',
-                    '-i', video_path,
-                    '-f', 'image2pipe',
-                    '-pix_fmt', 'rgb24',
-                    '-vcodec', 'rawvideo',
-                    '-'
-                ]
-                
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
-                
-                frame_size = info['width'] * info['height'] * 3
-                
-                while True:
-                    raw_frame = process.stdout.read(frame_size)
-                    if len(raw_frame) != frame_size:
-                        break
-                    
-                    frame = np.frombuffer(raw_frame, dtype=np.uint8)
-                    frame = frame.reshape((info['height'], info['width'], 3))
-                    frame_tensor = torch.from_numpy(frame.astype(np.float32) / 255.0)
-                    frames.append(frame_tensor)
-                
-                process.stdout.close()
-                process.wait()
-                
-                if frames:
-                    frame_count = len(frames)
-                    duration = frame_count / info['fps'] if info['fps'] > 0 else 0
-                    return torch.stack(frames), info['fps'], duration, frame_count
+                sink = FrameBuffer(window['count'] or estimate_frame_count(info), dtype)
+                buffer = decode(video_path, info, window, size, resample, sink=sink)
             except FileNotFoundError:
-                print("ffmpeg not found in system PATH")
+                print(f"{name} not found in system PATH")
+                continue
+            except InterruptProcessingException:
+                raise
             except Exception as e:
-                print(f"ffmpeg failed to load video: {e}")
+                print(f"{name} failed to load video: {e}")
+                continue
+            
+            frames = buffer.tensor() if buffer is not None else None
+            if frames is None:
+                print(f"{name}: No frames extracted")
+                continue
+            
+            return cls._window_result(frames, info, window)
         
+        cls._raise_no_backend()
+
+    @classmethod
+    def _window_result(cls, frames, info, window):
+        """Build the load result for a decoded window."""
+        # Strided output plays back at a proportionally lower rate
+        fps = info['fps'] / window['stride']
+        frame_count = frames.shape[0]
+        duration = frame_count / fps if fps > 0 else 0
+        indices = [window['start'] + i * window['stride'] for i in range(frame_count)]
+        timestamps = [index / info['fps'] for index in indices]
+        return frames, fps, duration, frame_count, indices, timestamps
+
+    @classmethod
+    def _sampled_result(cls, frames, info, indices, timestamps):
+        """Build the load result for sampled frames, keeping the source fps."""
+        fps = info['fps']
+        duration = timestamps[-1] - timestamps[0] + 1 / fps if timestamps and fps > 0 else 0
+        return frames, fps, duration, frames.shape[0], indices, timestamps
+
+    @classmethod
+    def _backends(cls, video_path=None, info=None, benchmark=True):
+        """Return the available (name, decode function) pairs, fastest first.
+        
+        The first call with a clip of a new class benchmarks the installed back
+        ends on it; the measured order is reused until decoder_registry.refresh().
+        Proxies and callers passing benchmark=False only read the measured order.
+        """
+        decoders = {
+            "cv2": cls._decode_cv2,
+            "imageio": cls._decode_imageio,
+            "ffmpeg": cls._decode_ffmpeg,
+        }
+        if video_path is not None and benchmark and not proxy_cache.contains(video_path):
+            order = decoder_registry.rank(decoders, video_path, info)
+        else:
+            order = decoder_registry.order(video_path, info)
+        return [(name, decoders[name]) for name in order]
+
+    @classmethod
+    def _load_from_disk_cache(cls, video_path, info, window, size, resample, dtype=torch.float32):
+        """Convert the requested window from the memory-mapped clip cache.
+        
+        On a miss the whole clip is decoded once to uint8 on disk; later loads
+        with any window or output size only map the file.
+        
+        Returns:
+            Frames tensor, or None if the clip could not be cached
+        """
+        cached = frame_disk_cache.open(video_path, loader="VideoFromFolder")
+        if cached is None:
+            full_window = resolve_frame_window(info['fps'], total_frames=info.get('frame_count', 0))
+            for name, decode in cls._backends(video_path, info):
+                writer = frame_disk_cache.writer(video_path, {'fps': info['fps']}, loader="VideoFromFolder")
+                try:
+                    if decode(video_path, info, full_window, sink=writer) is None or not len(writer):
+                        writer.abort()
+                        continue
+                except InterruptProcessingException:
+                    writer.abort()
+                    raise
+                except Exception as e:
+                    writer.abort()
+                    print(f"{name} failed to cache video: {e}")
+                    continue
+                writer.commit()
+                break
+            cached = frame_disk_cache.open(video_path, loader="VideoFromFolder")
+            if cached is None:
+                return None
+        
+        data, _ = cached
+        return frames_from_array(data, window, size, resample, dtype)
+
+    @classmethod
+    def _decode_segment(cls, decode, video_path, info, window, size, resample, out, offset):
+        """Decode one segment into its slice of the shared output.
+        
+        Returns:
+            int: Number of frames written
+        """
+        sink = TensorSlotSink(out, offset, window['count'])
+        if decode(video_path, info, window, size, resample, sink=sink) is None:
+            return 0
+        return len(sink)
+
+    @classmethod
+    def _load_parallel(cls, video_path, info, window, size, resample, segments, dtype=torch.float32):
+        """Decode the window as contiguous segments on parallel threads.
+        
+        cv2 decodes in native code without the GIL and ffmpeg runs in its own
+        process, so threads overlap the decoding without forking the server.
+        The output tensor is allocated once; each thread seeks to its first
+        source frame and writes its frames straight into its slice, so frame
+        order and count follow the serial path. Returns None (and the caller
+        decodes serially) when the frame count is unknown, no seekable back end
+        is available, or any segment comes back short.
+        
+        Returns:
+            Frames tensor, or None
+        """
+        count = window['count']
+        if count < 2:
+            return None
+        # Only back ends that can seek straight to a segment's first frame
+        seekable = [decode for name, decode in cls._backends(video_path, info) if name in ("cv2", "ffmpeg")]
+        if not seekable:
+            return None
+        decode = seekable[0]
+        
+        width, height = size if size is not None else (info['width'], info['height'])
+        out = torch.empty((count, height, width, 3), dtype=dtype)
+        bounds = split_segments(count, segments)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix="klinter-segment") as pool:
+                futures = []
+                for offset, length in bounds:
+                    segment = {
+                        'start': window['start'] + offset * window['stride'],
+                        'end': window['end'],
+                        'stride': window['stride'],
+                        'max_frames': length,
+                        'count': length,
+                    }
+                    futures.append(pool.submit(cls._decode_segment, decode, video_path, info,
+                                               segment, size, resample, out, offset))
+                decoded = [future.result() for future in futures]
+        except InterruptProcessingException:
+            raise
+        except Exception as e:
+            print(f"Parallel decode failed, decoding serially: {e}")
+            return None
+        
+        # Only the last segment may run short (probe overcounted the clip)
+        for (offset, length), got in zip(bounds[:-1], decoded[:-1]):
+            if got != length:
+                print(f"Segment at frame {offset} returned {got}/{length} frames, decoding serially")
+                return None
+        total = bounds[-1][0] + decoded[-1]
+        return out if total == count else out[:total]
+
+    @classmethod
+    def _raise_no_backend(cls):
+        """Raise an error naming the missing decoding back ends."""
         # If all methods failed
-        if not frames:
-            error_msg = "Could not load video. Please install one of: "
-            requirements = []
-            if not HAS_CV2:
-                requirements.append("opencv-python (pip install opencv-python)")
-            if not HAS_IMAGEIO:
-                requirements.append("imageio[ffmpeg] (pip install imageio[ffmpeg])")
-            if not HAS_FFMPEG:
-                requirements.append("ffmpeg (system package)")
-            
-            raise ValueError(error_msg + ", ".join(requirements))
+        error_msg = "Could not load video. Please install one of: "
+        requirements = []
+        if not decoder_registry.available('cv2'):
+            requirements.append("opencv-python (pip install opencv-python)")
+        if not decoder_registry.available('imageio'):
+            requirements.append("imageio[ffmpeg] (pip install imageio[ffmpeg])")
+        if not decoder_registry.available('ffmpeg'):
+            requirements.append("ffmpeg (system package)")
         
-        frame_count = len(frames)
-        duration = frame_count / info['fps'] if info['fps'] > 0 else 0
-        return torch.stack(frames), info['fps'], duration, frame_count
+        raise ValueError(error_msg + ", ".join(requirements))
 
     @classmethod
     def calculate_video_index(cls, seed, seed_mode, seed_offset, num_videos):
@@ -303,7 +829,25 @@ class VideoFromFolder(io.ComfyNode):
         return index % num_videos
 
     @classmethod
-    def execute(cls, folder_path, seed, seed_mode, seed_offset=0) -> io.NodeOutput:
+    def _schedule_prefetch(cls, folder_path, video_files, seed, seed_offset, decode_kwargs):
+        """Start decoding the video the next increment run will select."""
+        next_index = cls.calculate_video_index(seed + 1, "increment", seed_offset, len(video_files))
+        next_path = os.path.join(folder_path, video_files[next_index])
+        try:
+            key = clip_key(next_path, **decode_kwargs)
+        except OSError:
+            return
+        if key in clip_cache:
+            return
+        cls._prefetcher.submit(key, cls.load_video_frames, next_path, **decode_kwargs)
+
+    @classmethod
+    def execute(cls, folder_path, seed, seed_mode, seed_offset=0, window_unit="frames",
+                start=0.0, end=0.0, frame_stride=1, max_frames=0, target_width=0,
+                target_height=0, max_side=0, resample="area", disk_cache=False,
+                parallel_segments=1, output_dtype="float32", prefetch=False, sampling="window",
+                num_samples=8, load_audio=False, selection="file", scene_threshold=0.15,
+                min_shot_seconds=1.0, proxy=False) -> io.NodeOutput:
         """Load a single video from folder based on seed selection.
         
         Args:
@@ -311,28 +855,91 @@ class VideoFromFolder(io.ComfyNode):
             seed: Seed value for selection
             seed_mode: 'increment', 'random', or 'fixed'
             seed_offset: Additional offset to apply to the selection
+            window_unit: Whether start/end are in 'frames' or 'seconds'
+            start: Start of the frame window to decode
+            end: End of the frame window to decode (0 = end of video)
+            frame_stride: Keep every Nth frame of the window
+            max_frames: Maximum number of frames to load (0 = no limit)
+            target_width: Decode width (0 = keep aspect / source)
+            target_height: Decode height (0 = keep aspect / source)
+            max_side: Downscale so the longer side fits (0 = no limit)
+            resample: Resampling filter for decode-time downscaling
+            disk_cache: Serve frames from the memory-mapped on-disk clip cache
+            parallel_segments: Number of segments decoded on parallel threads
+            output_dtype: Precision of the frames output
+            prefetch: In increment mode, decode the next video on a background thread
+            sampling: 'window', 'keyframes' or 'uniform'
+            num_samples: Frames taken in uniform sampling
+            load_audio: Also output the audio of the window
+            selection: 'file' to pick a video, 'shot' to pick one shot across all videos
+            scene_threshold: Frame difference that counts as a cut when indexing shots
+            min_shot_seconds: Shots shorter than this are never selected
+            proxy: Decode the low-resolution proxy instead of the source
         
         Returns:
-            io.NodeOutput: Frames tensor, video path, video index, fps, duration, frame_count
+            io.NodeOutput: Frames tensor, video path, video index, fps, duration,
+            frame_count, source frame indices, source timestamps, audio
         """
         # Get all video files in the folder
         video_files = cls.get_video_files(folder_path)
         num_videos = len(video_files)
         
-        # Calculate which video to load
-        video_index = cls.calculate_video_index(seed, seed_mode, seed_offset, num_videos)
+        if selection == "shot":
+            # The seed walks (file, shot) pairs; the window becomes the shot
+            shots = cls.get_shots(folder_path, video_files, scene_threshold, min_shot_seconds)
+            shot_index = cls.calculate_video_index(seed, seed_mode, seed_offset, len(shots))
+            # The shot carries its file's index; looking it up would scan a manifest
+            video_index, selected_video, start, end = shots[shot_index]
+            window_unit = "frames"
+            print(f"Loading shot {shot_index + 1}/{len(shots)}: {selected_video} frames {start}-{end}")
+        else:
+            # Calculate which video to load
+            video_index = cls.calculate_video_index(seed, seed_mode, seed_offset, num_videos)
+            selected_video = video_files[video_index]
+            print(f"Loading video {video_index + 1}/{num_videos}: {selected_video}")
         
-        # Get the selected video file
-        selected_video = video_files[video_index]
         full_video_path = os.path.join(folder_path, selected_video)
-        
-        print(f"Loading video {video_index + 1}/{num_videos}: {selected_video}")
         print(f"Seed: {seed}, Mode: {seed_mode}, Offset: {seed_offset}")
         
-        # Load the video frames
-        frames, fps, duration, frame_count = cls.load_video_frames(full_video_path)
+        decode_kwargs = {
+            'start': start,
+            'end': end,
+            'window_unit': window_unit,
+            'frame_stride': frame_stride,
+            'max_frames': max_frames,
+            'target_width': target_width,
+            'target_height': target_height,
+            'max_side': max_side,
+            'resample': resample,
+            'disk_cache': disk_cache,
+            'parallel_segments': parallel_segments,
+            'output_dtype': output_dtype,
+            'sampling': sampling,
+            'num_samples': num_samples,
+            'audio': load_audio,
+            'proxy': proxy_cache.enabled(proxy),
+        }
+        
+        key = clip_key(full_video_path, **decode_kwargs)
+        loaded = clip_cache.get(key)
+        if loaded is None:
+            # Use the previous run's background decode if it targeted this video
+            loaded = cls._prefetcher.take(key)
+            if loaded is None:
+                loaded = cls.load_video_frames(full_video_path, **decode_kwargs)
+            else:
+                print(f"Using prefetched frames for {selected_video}")
+            clip_cache.put(key, loaded)
+        else:
+            print(f"Using cached frames for {selected_video}")
+        frames, fps, duration, frame_count, indices, timestamps, audio = loaded
+        
+        # Prefetch predicts the next file, which shot selection does not walk
+        if prefetch and seed_mode == "increment" and selection == "file":
+            cls._schedule_prefetch(folder_path, video_files, seed, seed_offset, decode_kwargs)
         
-        return io.NodeOutput(frames, full_video_path, video_index, fps, duration, frame_count)
+        return io.NodeOutput(frames, full_video_path, video_index, fps, duration, frame_count,
+                             indices, timestamps, audio)
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
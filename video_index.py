@@ -0,0 +1,51 @@
+"""Persistent per-folder index of the video files read by the klinter video loaders."""
+
+import os
+from .folder_index import FolderIndex
+
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v'}
+
+
+class VideoFolderIndex(FolderIndex):
+    """Sidecar JSON index of the video files in one folder.
+
+    Besides the listing, each entry keeps the file's probed metadata (fps,
+    resolution, duration, frame count) and, once requested, its shots from
+    scene-cut detection, so repeated runs skip the container probes.
+    """
+
+    INDEX_FILENAME = "videos.json"
+    EXTENSIONS = VIDEO_EXTENSIONS
+
+    def get_scenes(self, name: str, detect, threshold: float, save: bool = True) -> list:
+        """Return a file's shots, running scene detection only if the file or threshold changed.
+
+        Args:
+            name: File name inside the folder
+            detect: Callable taking a full path and returning [start, end) shot
+                frame ranges, or None
+            threshold: Detection threshold the shots must have been computed with
+            save: Write the index afterwards; pass False when indexing many
+                files and call save() once at the end
+
+        Returns:
+            list: [start, end) frame ranges, or None if detection failed
+        """
+        path = os.path.join(self.folder_path, name)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.entries.get(name)
+            if (entry and entry.get('scenes') and entry['scenes']['threshold'] == threshold
+                    and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns):
+                return [list(shot) for shot in entry['scenes']['shots']]
+
+        shots = detect(path)
+        if shots is None:
+            return None
+
+        with self._lock:
+            self._entry(name, stat)['scenes'] = {'threshold': threshold, 'shots': shots}
+            self._dirty = True
+            if save:
+                self.save()
+        return shots
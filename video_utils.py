@@ -0,0 +1,521 @@
+"""Shared helpers for the klinter video loader nodes."""
+
+import os
+import re
+import json
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
+from PIL import Image
+from .ffmpeg_reader import InterruptProcessingException
+from .tensor_utils import uint8_to_float
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+# Resampling filters offered by the loader nodes, mapped to each back end
+RESAMPLE_FILTERS = ["area", "bilinear", "bicubic", "lanczos", "nearest"]
+FFMPEG_SCALE_FLAGS = {
+    "area": "area",
+    "bilinear": "bilinear",
+    "bicubic": "bicubic",
+    "lanczos": "lanczos",
+    "nearest": "neighbor",
+}
+PIL_RESAMPLE = {
+    "area": Image.BOX,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+    "nearest": Image.NEAREST,
+}
+if HAS_CV2:
+    CV2_INTERPOLATION = {
+        "area": cv2.INTER_AREA,
+        "bilinear": cv2.INTER_LINEAR,
+        "bicubic": cv2.INTER_CUBIC,
+        "lanczos": cv2.INTER_LANCZOS4,
+        "nearest": cv2.INTER_NEAREST,
+    }
+
+# Process-wide probe results keyed on (path, mtime, size)
+_probe_cache = {}
+_probe_cache_lock = threading.Lock()
+
+
+def _write_frame(target: torch.Tensor, frame: torch.Tensor):
+    """Convert a uint8 frame to [0, 1] floats in place in target."""
+    target.copy_(frame)
+    target.div_(255.0)
+
+
+class FrameBuffer:
+    """Preallocated output tensor that decoded frames are written into in place.
+
+    The buffer is sized from the probed frame count so a decode holds roughly
+    one copy of the output instead of a list of per-frame tensors plus the
+    stacked result. If the probe undercounted, capacity grows; if it
+    overcounted, the unused tail is dropped when the buffer is finalized.
+    """
+
+    DEFAULT_CAPACITY = 256
+
+    def __init__(self, capacity: int = 0, dtype: torch.dtype = torch.float32):
+        """Create an empty buffer.
+
+        Args:
+            capacity: Expected number of frames (0 if unknown)
+            dtype: Floating point dtype of the output tensor
+        """
+        self.capacity = int(capacity) if capacity and capacity > 0 else self.DEFAULT_CAPACITY
+        self.dtype = dtype
+        self.count = 0
+        self._tensor = None
+
+    def _grow(self):
+        """Enlarge the buffer when the probed frame count was too low."""
+        new_capacity = self.capacity + max(self.capacity // 2, 16)
+        grown = torch.empty((new_capacity,) + tuple(self._tensor.shape[1:]), dtype=self.dtype)
+        grown[:self.count].copy_(self._tensor[:self.count])
+        self._tensor = grown
+        self.capacity = new_capacity
+
+    def append(self, frame):
+        """Convert one HxWxC uint8 frame to [0, 1] floats directly into the buffer.
+
+        Args:
+            frame: uint8 numpy array or tensor of shape (H, W, C)
+        """
+        if not isinstance(frame, torch.Tensor):
+            frame = torch.from_numpy(frame)
+
+        if self._tensor is None:
+            # Allocate from the first decoded frame: probed sizes can disagree
+            # with the decoder (rotation metadata, odd-sized crops).
+            self._tensor = torch.empty((self.capacity,) + tuple(frame.shape), dtype=self.dtype)
+        elif tuple(frame.shape) != tuple(self._tensor.shape[1:]):
+            raise ValueError(
+                f"Frame {self.count} has shape {tuple(frame.shape)}, "
+                f"expected {tuple(self._tensor.shape[1:])}"
+            )
+
+        if self.count == self.capacity:
+            self._grow()
+
+        _write_frame(self._tensor[self.count], frame)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def tensor(self) -> torch.Tensor:
+        """Return the filled frames as a (N, H, W, C) tensor.
+
+        Returns:
+            torch.Tensor: Frames written so far, or None if no frame was written
+        """
+        if self._tensor is None or self.count == 0:
+            return None
+        if self.count == self.capacity:
+            return self._tensor
+        frames = self._tensor[:self.count]
+        # Only pay for a compacting copy when the probe overestimated badly;
+        # otherwise a view over the slightly larger storage is cheaper.
+        if self.capacity - self.count > self.capacity // 4:
+            frames = frames.clone()
+            self._tensor = None
+        return frames
+
+
+class TensorSlotSink:
+    """Frame sink that writes into a fixed slice of an existing frames tensor.
+
+    Used by segment workers to fill their part of a shared-memory output
+    tensor in frame order.
+    """
+
+    def __init__(self, out: torch.Tensor, offset: int, limit: int):
+        """Create a sink for out[offset:offset + limit].
+
+        Args:
+            out: Preallocated (N, H, W, C) float tensor
+            offset: First output index this sink writes
+            limit: Maximum number of frames this sink may write
+        """
+        self.out = out
+        self.offset = offset
+        self.limit = limit
+        self.count = 0
+
+    def append(self, frame):
+        """Convert one HxWxC uint8 frame into the next slot."""
+        if not isinstance(frame, torch.Tensor):
+            frame = torch.from_numpy(frame)
+        if self.count >= self.limit:
+            raise ValueError(f"Segment at {self.offset} received more than {self.limit} frames")
+        target = self.out[self.offset + self.count]
+        if tuple(frame.shape) != tuple(target.shape):
+            raise ValueError(f"Frame has shape {tuple(frame.shape)}, expected {tuple(target.shape)}")
+        _write_frame(target, frame)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+class SceneCutDetector:
+    """Frame sink that finds hard cuts instead of storing frames.
+
+    Each frame (normally decoded at a thumbnail size) is compared with the
+    previous one; a mean absolute difference above the threshold starts a
+    new shot. Only the previous frame is kept.
+    """
+
+    def __init__(self, threshold: float = 0.15, min_gap: int = 1):
+        """Create a detector.
+
+        Args:
+            threshold: Mean absolute pixel difference in [0, 1] that counts as a cut
+            min_gap: Minimum frames between two cuts, so flashes do not split shots
+        """
+        self.threshold = threshold
+        self.min_gap = max(int(min_gap), 1)
+        self.cuts = []
+        self.count = 0
+        self._previous = None
+
+    def append(self, frame):
+        """Compare one HxWxC uint8 frame with the previous one."""
+        current = np.asarray(frame, dtype=np.int16)
+        if self._previous is not None:
+            difference = np.abs(current - self._previous).mean() / 255.0
+            last_cut = self.cuts[-1] if self.cuts else 0
+            if difference > self.threshold and self.count - last_cut >= self.min_gap:
+                self.cuts.append(self.count)
+        self._previous = current
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def shots(self) -> list:
+        """Return the detected shots as [start, end) frame ranges."""
+        bounds = [0, *self.cuts, self.count]
+        return [[start, end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def split_segments(count: int, segments: int) -> list:
+    """Split count output frames into up to `segments` contiguous (offset, length) ranges."""
+    segments = max(1, min(segments, count))
+    base, extra = divmod(count, segments)
+    bounds = []
+    offset = 0
+    for i in range(segments):
+        length = base + (1 if i < extra else 0)
+        bounds.append((offset, length))
+        offset += length
+    return bounds
+
+
+def estimate_frame_count(info: dict) -> int:
+    """Best-effort frame count from probed video info.
+
+    Args:
+        info: Video info dict with fps, duration and optionally frame_count
+
+    Returns:
+        int: Estimated number of frames, or 0 if unknown
+    """
+    frame_count = info.get('frame_count') or 0
+    if frame_count > 0:
+        return int(frame_count)
+    fps = info.get('fps') or 0
+    duration = info.get('duration') or 0
+    if fps > 0 and duration > 0:
+        return int(round(fps * duration))
+    return 0
+
+
+def resolve_frame_window(fps: float, start: float = 0.0, end: float = 0.0, unit: str = "frames",
+                         stride: int = 1, max_frames: int = 0, total_frames: int = 0) -> dict:
+    """Translate window inputs into source frame indices.
+
+    Args:
+        fps: Source frame rate
+        start: Window start, in `unit`
+        end: Window end (exclusive) in `unit`, 0 for the end of the clip
+        unit: "frames" or "seconds"
+        stride: Keep every `stride`-th frame of the window
+        max_frames: Maximum number of frames to return, 0 for no limit
+        total_frames: Probed frame count of the source, 0 if unknown
+
+    Returns:
+        dict: start/end source frame (end 0 = open), stride, max_frames and the
+        expected output frame count (0 if unknown)
+    """
+    stride = max(int(stride), 1)
+    max_frames = max(int(max_frames), 0)
+    if unit == "seconds":
+        start_frame = int(round(start * fps))
+        end_frame = int(round(end * fps)) if end > 0 else 0
+    else:
+        start_frame = int(start)
+        end_frame = int(end)
+
+    if total_frames > 0:
+        if start_frame >= total_frames:
+            raise ValueError(f"Window start {start_frame} is past the last frame ({total_frames})")
+        if end_frame == 0 or end_frame > total_frames:
+            end_frame = total_frames
+    if end_frame and end_frame <= start_frame:
+        raise ValueError(f"Window end ({end_frame}) must be after start ({start_frame})")
+
+    count = -(-(end_frame - start_frame) // stride) if end_frame else 0
+    if max_frames:
+        count = min(count, max_frames) if count else max_frames
+
+    return {
+        'start': start_frame,
+        'end': end_frame,
+        'stride': stride,
+        'max_frames': max_frames,
+        'count': count,
+    }
+
+
+
+def resolve_output_size(width: int, height: int, target_width: int = 0,
+                        target_height: int = 0, max_side: int = 0):
+    """Work out the decode resolution from the resize inputs.
+
+    Args:
+        width: Source width
+        height: Source height
+        target_width: Output width, 0 to derive it from the height
+        target_height: Output height, 0 to derive it from the width
+        max_side: Cap on the longer side (never upscales), 0 for no cap
+
+    Returns:
+        tuple: (width, height) to decode at, or None to keep the source size
+    """
+    out_w, out_h = width, height
+    if target_width > 0 and target_height > 0:
+        out_w, out_h = target_width, target_height
+    elif target_width > 0:
+        out_w, out_h = target_width, max(1, round(height * target_width / width))
+    elif target_height > 0:
+        out_w, out_h = max(1, round(width * target_height / height)), target_height
+
+    if max_side > 0 and max(out_w, out_h) > max_side:
+        scale = max_side / max(out_w, out_h)
+        out_w, out_h = max(1, round(out_w * scale)), max(1, round(out_h * scale))
+
+    if (out_w, out_h) == (width, height):
+        return None
+    return out_w, out_h
+
+
+def resize_frame(frame: np.ndarray, size, resample: str = "area") -> np.ndarray:
+    """Resize one uint8 HxWxC frame before it is converted to float.
+
+    Args:
+        frame: uint8 frame array
+        size: (width, height) to resize to
+        resample: One of RESAMPLE_FILTERS
+
+    Returns:
+        np.ndarray: Resized uint8 frame
+    """
+    if HAS_CV2:
+        return cv2.resize(frame, size, interpolation=CV2_INTERPOLATION[resample])
+    return np.asarray(Image.fromarray(frame).resize(size, PIL_RESAMPLE[resample]))
+
+
+def frames_from_array(frames: np.ndarray, window: dict, size=None, resample: str = "area",
+                      dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """Convert the window of an already decoded uint8 clip to a float frames tensor.
+
+    Used for memory-mapped clips: only the selected frames are read from disk
+    and converted.
+
+    Args:
+        frames: uint8 array of shape (N, H, W, C), typically a np.memmap
+        window: Resolved frame window from resolve_frame_window
+        size: Optional (width, height) to resize to
+        resample: Resampling filter used when resizing
+        dtype: Output floating point dtype
+
+    Returns:
+        torch.Tensor: Float frames, or None if the window selects nothing
+    """
+    end = min(window['end'] or len(frames), len(frames))
+    indices = range(window['start'], end, window['stride'])
+    if window['max_frames']:
+        indices = indices[:window['max_frames']]
+    if not indices:
+        return None
+    if size is None:
+        # No per-frame work: convert the selected slice in large chunks
+        return uint8_to_float(frames[indices.start:indices.stop:indices.step], dtype)
+    buffer = FrameBuffer(len(indices), dtype)
+    for index in indices:
+        buffer.append(resize_frame(np.asarray(frames[index]), size, resample))
+    return buffer.tensor()
+
+
+def parse_frame_rate(rate: str, default: float = 24.0) -> float:
+    """Parse an ffprobe rate string such as '30000/1001' or '25'."""
+    if not rate:
+        return default
+    if '/' in rate:
+        num, den = map(int, rate.split('/'))
+        return num / den if den != 0 else default
+    return float(rate)
+
+
+def showinfo_pts_time(line: str):
+    """Presentation time in seconds from an ffmpeg showinfo log line, or None for other lines."""
+    if 'Parsed_showinfo' not in line:
+        return None
+    match = re.search(r'pts_time:\s*(-?[\d.]+)', line)
+    return float(match.group(1)) if match else None
+
+
+def ffprobe_video_info(video_path: str, executable: str = 'ffprobe') -> dict:
+    """Probe fps, size, duration, frame count and audio presence with a single ffprobe call.
+
+    Args:
+        video_path: Path to the video file
+        executable: ffprobe binary to run
+
+    Returns:
+        dict: Video metadata (fps, avg_fps, width, height, duration,
+        frame_count, has_audio and, with audio, audio_sample_rate and
+        audio_channels). fps is r_frame_rate; a variable frame rate stream
+        has an avg_fps that differs from it
+    """
+    cmd = [
+        executable,
+        '-v', 'error',
+        '-show_entries', 'stream=codec_type,r_frame_rate,avg_frame_rate,width,height,nb_frames,duration,'
+                         'sample_rate,channels:format=duration',
+        '-of', 'json',
+        video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFprobe error: {result.stderr}")
+
+    data = json.loads(result.stdout)
+    streams = data.get('streams', [])
+    video_streams = [s for s in streams if s.get('codec_type', 'video') == 'video' and 'width' in s]
+    audio_streams = [s for s in streams if s.get('codec_type') == 'audio']
+    if not video_streams:
+        raise RuntimeError(f"FFprobe error: no video stream in {video_path}")
+    stream = video_streams[0]
+
+    # Container duration is more reliable than the stream's for most formats
+    duration = data.get('format', {}).get('duration') or stream.get('duration') or 0
+    info = {
+        'fps': parse_frame_rate(stream.get('r_frame_rate')),
+        'avg_fps': parse_frame_rate(stream.get('avg_frame_rate'), default=0.0),
+        'width': int(stream['width']),
+        'height': int(stream['height']),
+        'duration': float(duration),
+        'frame_count': int(stream.get('nb_frames', 0) or 0),
+        'has_audio': bool(audio_streams),
+    }
+    if audio_streams:
+        info['audio_sample_rate'] = int(audio_streams[0].get('sample_rate', 0) or 0)
+        info['audio_channels'] = int(audio_streams[0].get('channels', 0) or 0)
+    return info
+
+
+def cached_probe(video_path: str, probe, kind: str) -> dict:
+    """Memoize a probe function on the file's path, mtime and size.
+
+    The cache is shared by every loader in the pack, so a file probed by one
+    node is a dict lookup for the next node using the same kind of probe.
+
+    Args:
+        video_path: Path to the video file
+        probe: Callable taking the path and returning an info dict or None
+        kind: Name of the info schema probe returns; probes with different
+            fields must not share entries
+
+    Returns:
+        dict: Copy of the probed info, or None if probing failed
+    """
+    stat = os.stat(video_path)
+    key = (kind, os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+    with _probe_cache_lock:
+        info = _probe_cache.get(key)
+    if info is not None:
+        return dict(info)
+
+    info = probe(video_path)
+    if info is None:
+        return None
+    with _probe_cache_lock:
+        _probe_cache[key] = dict(info)
+    return info
+
+
+class Prefetcher:
+    """Runs one look-ahead load on a background thread and hands it over by key.
+
+    At most one prefetched result is kept: submitting a new key or taking a
+    different key drops the previous one, which bounds the extra memory to a
+    single clip.
+    """
+
+    def __init__(self, name: str = "klinter-prefetch"):
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+        self._key = None
+        self._future = None
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Start computing fn(*args, **kwargs) in the background under key."""
+        with self._lock:
+            if self._future is not None and self._key == key:
+                return
+            if self._future is not None:
+                self._future.cancel()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+            self._key = key
+            self._future = self._executor.submit(fn, *args, **kwargs)
+
+    def take(self, key):
+        """Return the prefetched result for key, waiting if it is still running.
+
+        A cancel that reached the background load has already cleared
+        ComfyUI's interrupt flag, so it is raised here instead of being lost.
+
+        Returns:
+            The prefetched result, or None if nothing matching was prefetched
+        """
+        with self._lock:
+            future, self._future = self._future, None
+            matched, self._key = self._key == key, None
+        if future is None:
+            return None
+        if not matched:
+            if not future.cancel() and future.done() and \
+                    isinstance(future.exception(), InterruptProcessingException):
+                raise future.exception()
+            return None
+        try:
+            return future.result()
+        except InterruptProcessingException:
+            raise
+        except Exception as e:
+            print(f"Prefetch failed, loading directly: {e}")
+            return None